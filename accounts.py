@@ -0,0 +1,102 @@
+"""Player accounts stored in SQLite, safe to share between threads."""
+import sqlite3
+import threading
+import time
+
+from engine import INITIAL_MONEY
+
+ACCOUNTS_FILE = "casino_accounts.db"
+MAX_AMOUNT = 2 ** 63 - 1  # el mayor INTEGER que guarda SQLite
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL,
+    total_won INTEGER NOT NULL DEFAULT 0,
+    total_lost INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+SELECT_PLAYER = "SELECT balance, total_won, total_lost FROM players WHERE player_id = ?"
+INSERT_PLAYER = "INSERT OR IGNORE INTO players (player_id, balance, updated_at) VALUES (?, ?, ?)"
+SETTLE = """
+UPDATE players
+SET balance = balance + ? - ?, total_won = total_won + ?, total_lost = total_lost + ?, updated_at = ?
+WHERE player_id = ? AND balance >= ?
+"""
+
+
+class UnknownPlayerError(KeyError):
+    pass
+
+
+class InsufficientFundsError(ValueError):
+    pass
+
+
+class AccountStore:
+    def __init__(self, path=ACCOUNTS_FILE, timeout=5.0):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        self.connection().execute(SCHEMA)
+
+    def connection(self):
+        # una conexion por hilo, reutilizada en todas las operaciones
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # cada hilo usa solo la suya, pero close() las cierra todas desde cualquier hilo
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, cached_statements=32,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def get(self, player_id):
+        row = self.connection().execute(SELECT_PLAYER, (player_id,)).fetchone()
+        if row is None:
+            return None
+        return {"player_id": player_id, "balance": row[0], "total_won": row[1], "total_lost": row[2]}
+
+    def open_account(self, player_id, balance=INITIAL_MONEY):
+        self.connection().execute(INSERT_PLAYER, (player_id, balance, time.time()))
+        return self.get(player_id)
+
+    def settle(self, player_id, stake, won, lost):
+        # la apuesta se valida y se paga en una sola transaccion
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = connection.execute(SETTLE, (won, lost, won, lost, time.time(), player_id, stake))
+            if cursor.rowcount == 0:
+                if connection.execute(SELECT_PLAYER, (player_id,)).fetchone() is None:
+                    raise UnknownPlayerError(player_id)
+                raise InsufficientFundsError("No tienes suficiente saldo para esta apuesta.")
+            account = self.get(player_id)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return account
+
+    def settle_result(self, player_id, result):
+        return self.settle(player_id, result.bet, result.winnings, result.lost)
+
+    def debit(self, player_id, amount):
+        return self.settle(player_id, amount, 0, amount)
+
+    def credit(self, player_id, amount):
+        return self.settle(player_id, 0, amount, 0)
+
+    def close(self):
+        # los hilos que sigan usando el store abren una conexion nueva
+        with self.connections_lock:
+            connections, self.connections = self.connections, []
+            self.local = threading.local()
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,188 @@
+"""Bankroll simulation of many players betting in lockstep with NumPy arrays.
+
+Each round draws one outcome per player from the exact return distribution
+of the paytable, so a round costs a handful of vector operations no matter
+how many players there are. Players who can no longer afford a bet are
+dropped from the active set and keep their final balance.
+
+Balances are float64: they hold whole dollars exactly up to 2**53, and a
+table that returns more than the stake can grow balances far past the
+int64 range without stopping the run.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from engine import INITIAL_MONEY, SCRATCH_TABLE, SLOT_TABLE
+from odds import return_distribution
+
+STRATEGIES = ("flat", "martingale", "percentage")
+PERCENTILES = (5, 25, 50, 75, 95)
+COMPACT_RATIO = 0.75
+MAX_LOOKUP = 1 << 20
+
+
+class OutcomeSampler:
+    # devuelve el retorno por unidad apostada con la distribucion exacta de la tabla
+    def __init__(self, table):
+        distribution = sorted(return_distribution(table).items())
+        self.returns = np.array([float(unit_return) for unit_return, _ in distribution], dtype=np.float64)
+        self.denominator = math.lcm(*(p.denominator for _, p in distribution))
+        self.lookup = None
+        if self.denominator <= MAX_LOOKUP:
+            # con un denominador chico basta un entero uniforme y una tabla de busqueda
+            counts = [int(p * self.denominator) for _, p in distribution]
+            self.lookup = np.repeat(self.returns, counts)
+        else:
+            self.cumulative = np.cumsum([float(p) for _, p in distribution])
+            self.cumulative[-1] = 1.0
+
+    def draw(self, rng, n):
+        if self.lookup is not None:
+            return self.lookup[rng.integers(0, self.denominator, size=n, dtype=np.int32)]
+        index = np.searchsorted(self.cumulative, rng.random(n), side="right")
+        return self.returns[np.minimum(index, len(self.returns) - 1)]
+
+
+def order_statistics(values, percentiles):
+    # percentiles por rango mas cercano; cada particion trabaja solo en su tramo,
+    # mucho mas barato que np.percentile con varios cortes sobre un millon de valores
+    values = values.copy()
+    n = len(values)
+    ranks = sorted({round(p / 100 * (n - 1)) for p in percentiles})
+    pending = [(0, n, ranks)]
+    while pending:
+        low, high, inner = pending.pop()
+        if not inner:
+            continue
+        middle = len(inner) // 2
+        rank = inner[middle]
+        values[low:high] = np.partition(values[low:high], rank - low)
+        pending.append((low, rank, inner[:middle]))
+        pending.append((rank + 1, high, inner[middle + 1:]))
+    return np.array([values[round(p / 100 * (n - 1))] for p in percentiles], dtype=np.float64)
+
+
+def next_bets(strategy, balance, bet, won, base_bet, fraction):
+    # misma regla que SlotMachine.validate_bet: entera, mayor a cero y sin pasar del saldo
+    if strategy == "flat":
+        bet = np.full_like(balance, base_bet)
+    elif strategy == "martingale":
+        bet = np.where(won, base_bet, bet * 2)
+    else:
+        bet = np.floor(balance * fraction)
+    return np.clip(bet, 1, np.maximum(balance, 1))
+
+
+def simulate(players, rounds, strategy="flat", game="slot", base_bet=10, fraction=0.05,
+             initial=INITIAL_MONEY, percentiles=PERCENTILES, seed=None):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"La estrategia debe ser una de {STRATEGIES}")
+    if game not in ("slot", "scratch"):
+        raise ValueError(f"Juego desconocido: {game}")
+    table = SLOT_TABLE if game == "slot" else SCRATCH_TABLE
+    if game == "scratch":
+        # las tarjetas tienen precio fijo: no hay estrategia que aplicar
+        strategy, base_bet = "flat", table.price
+    if base_bet <= 0:
+        raise ValueError("La apuesta debe ser mayor a cero.")
+    if players <= 0:
+        raise ValueError("Se necesita al menos un jugador")
+
+    rng = np.random.default_rng(seed)
+    sampler = OutcomeSampler(table)
+    balance = np.full(players, initial, dtype=np.float64)
+    bust_round = np.full(players, -1, dtype=np.int32)
+    minimum = base_bet if game == "scratch" else 1
+
+    # solo se recorren los jugadores activos; el arreglo se compacta cuando se vacia
+    active = np.flatnonzero(balance >= minimum)
+    bust_round[balance < minimum] = 0
+    bets = next_bets(strategy, balance[active], np.full(len(active), base_bet, dtype=np.float64),
+                     np.ones(len(active), dtype=bool), base_bet, fraction)
+    alive = np.ones(len(active), dtype=bool)
+    n_alive = len(active)
+
+    curves = np.empty((rounds + 1, len(percentiles)), dtype=np.float64)
+    curves[0] = order_statistics(balance, percentiles)
+    ruined = np.empty(rounds + 1, dtype=np.float64)
+    ruined[0] = 1 - n_alive / players
+
+    for round_number in range(1, rounds + 1):
+        if n_alive == 0:
+            curves[round_number:] = curves[round_number - 1]
+            ruined[round_number:] = ruined[round_number - 1]
+            break
+        if n_alive < len(active) * COMPACT_RATIO:
+            active, bets = active[alive], bets[alive]
+            alive = np.ones(len(active), dtype=bool)
+
+        current = balance[active]
+        payouts = bets * sampler.draw(rng, len(active))
+        current = np.where(alive, current - bets + payouts, current)
+        balance[active] = current
+
+        busted = alive & (current < minimum)
+        if busted.any():
+            bust_round[active[busted]] = round_number
+            alive &= ~busted
+            n_alive = int(alive.sum())
+        bets = next_bets(strategy, current, bets, payouts >= bets, base_bet, fraction)
+
+        curves[round_number] = order_statistics(balance, percentiles)
+        ruined[round_number] = 1 - n_alive / players
+
+    busted_at = bust_round[bust_round >= 0]
+    return {
+        "players": players,
+        "rounds": rounds,
+        "strategy": strategy,
+        "game": game,
+        "percentiles": tuple(percentiles),
+        "curves": curves,
+        "ruined": ruined,
+        "ruin_probability": float(ruined[-1]),
+        "mean_bust_round": float(busted_at.mean()) if len(busted_at) else None,
+        "median_bust_round": float(np.median(busted_at)) if len(busted_at) else None,
+        "final": balance,
+    }
+
+
+def write_curves(path, report):
+    header = "round," + ",".join(f"p{p}" for p in report["percentiles"]) + ",ruined"
+    columns = np.column_stack([np.arange(len(report["ruined"])), report["curves"], report["ruined"]])
+    np.savetxt(path, columns, delimiter=",", header=header, comments="", fmt="%.6g")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate player bankrolls under a betting strategy.")
+    parser.add_argument("players", type=int)
+    parser.add_argument("rounds", type=int)
+    parser.add_argument("--game", choices=["slot", "scratch"], default="slot")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="flat")
+    parser.add_argument("--bet", type=int, default=10, help="flat bet and martingale base bet")
+    parser.add_argument("--fraction", type=float, default=0.05, help="share of the balance for percentage bets")
+    parser.add_argument("--initial", type=int, default=INITIAL_MONEY)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--report-every", type=int, default=100)
+    parser.add_argument("--csv", default=None, help="write the per-round percentile curves to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = simulate(args.players, args.rounds, args.strategy, args.game, args.bet, args.fraction,
+                      args.initial, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{report['players']} players x {report['rounds']} rounds ({report['game']}, {report['strategy']}) "
+          f"in {elapsed:.2f}s")
+    print("round  " + "  ".join(f"{'p' + str(p):>10}" for p in report["percentiles"]) + "    ruined")
+    for round_number in sorted(set(range(0, args.rounds + 1, max(1, args.report_every))) | {args.rounds}):
+        values = "  ".join(f"{value:>10.0f}" for value in report["curves"][round_number])
+        print(f"{round_number:>5}  {values}  {report['ruined'][round_number]:>8.2%}")
+    print(f"Ruin probability: {report['ruin_probability']:.4%}")
+    if report["mean_bust_round"] is not None:
+        print(f"Time to bust: mean {report['mean_bust_round']:.1f} rounds, median {report['median_bust_round']:.0f}")
+    if args.csv:
+        write_curves(args.csv, report)
@@ -0,0 +1,128 @@
+"""Play many rounds across processes with reproducible per-chunk random streams."""
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import SCRATCH_PRICE, draw_card, spin
+from jackpot import JackpotPool, triggers_jackpot
+from rng import FastRNG, derive_seed
+
+DEFAULT_CHUNK = 100_000
+JACKPOT_FLUSH_ROUNDS = 4096
+
+
+def chunk_rng(seed, chunk_index):
+    # cada bloque tiene su propio flujo, derivado solo de la semilla maestra y su indice
+    return FastRNG(derive_seed("casino", seed, chunk_index))
+
+
+def new_totals():
+    return {"rounds": 0, "wins": 0, "losses": 0, "wagered": 0, "won": 0, "lost": 0, "net": 0,
+            "jackpots": 0, "jackpot_paid": 0, "histogram": Counter()}
+
+
+def merge_totals(totals, other):
+    for key, value in other.items():
+        totals[key] += value
+    return totals
+
+
+def play_chunk(game, rounds, seed, chunk_index, bet):
+    rng = chunk_rng(seed, chunk_index)
+    totals = new_totals()
+    histogram = totals["histogram"]
+    wins = won = lost = 0
+    if game == "slot":
+        for _ in range(rounds):
+            result = spin(bet, rng)
+            histogram[result.unique] += 1
+            if result.winnings:
+                wins += 1
+            won += result.winnings
+            lost += result.lost
+    else:
+        for _ in range(rounds):
+            result = draw_card(rng, bet)
+            histogram[result.max_count] += 1
+            if result.winnings:
+                wins += 1
+            won += result.winnings
+            lost += result.lost
+    totals.update(rounds=rounds, wins=wins, losses=rounds - wins, wagered=rounds * bet, won=won, lost=lost, net=won - lost)
+    return totals
+
+
+def play_jackpot_chunk(game, rounds, seed, chunk_index, bet, jackpot_path):
+    # cada proceso suma en su propio shard; solo el premio toma el candado compartido
+    rng = chunk_rng(seed, chunk_index)
+    totals = new_totals()
+    histogram = totals["histogram"]
+    pool = JackpotPool(jackpot_path)
+    wins = won = lost = jackpots = paid = 0
+    for i in range(rounds):
+        result = spin(bet, rng) if game == "slot" else draw_card(rng, bet)
+        histogram[result.unique if game == "slot" else result.max_count] += 1
+        pool.contribute(bet)
+        if result.winnings:
+            wins += 1
+        won += result.winnings
+        lost += result.lost
+        if triggers_jackpot(game, result):
+            jackpots += 1
+            paid += pool.award(f"batch:{game}:{seed}:{chunk_index}:{i}")
+        if i % JACKPOT_FLUSH_ROUNDS == 0:
+            pool.maybe_flush()
+    pool.close()
+    won += paid
+    totals.update(rounds=rounds, wins=wins, losses=rounds - wins, wagered=rounds * bet, won=won, lost=lost,
+                  net=won - lost, jackpots=jackpots, jackpot_paid=paid)
+    return totals
+
+
+def run_rounds(game, rounds, seed=0, workers=None, chunk_size=DEFAULT_CHUNK, bet=None, jackpot_path=None):
+    if game not in ("slot", "scratch"):
+        raise ValueError(f"Juego desconocido: {game}")
+    if bet is None:
+        bet = SCRATCH_PRICE if game == "scratch" else 10
+
+    chunks = []
+    for index, start in enumerate(range(0, rounds, chunk_size)):
+        chunks.append((index, min(chunk_size, rounds - start)))
+
+    totals = new_totals()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        if jackpot_path is None:
+            futures = [pool.submit(play_chunk, game, size, seed, index, bet) for index, size in chunks]
+        else:
+            futures = [pool.submit(play_jackpot_chunk, game, size, seed, index, bet, jackpot_path)
+                       for index, size in chunks]
+        # se combinan en orden de bloque para que el resultado no dependa de la planificacion
+        for future in futures:
+            merge_totals(totals, future.result())
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play casino rounds in parallel.")
+    parser.add_argument("game", choices=["slot", "scratch"])
+    parser.add_argument("rounds", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--bet", type=int, default=None)
+    parser.add_argument("--jackpot", default=None, help="progressive jackpot path shared by all workers")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = run_rounds(args.game, args.rounds, args.seed, args.workers, args.chunk_size, args.bet, args.jackpot)
+    elapsed = time.perf_counter() - start
+
+    print(f"Rounds: {totals['rounds']} in {elapsed:.2f}s ({totals['rounds'] / elapsed:,.0f}/s)")
+    print(f"Wins: {totals['wins']}  Losses: {totals['losses']}")
+    print(f"Wagered: ${totals['wagered']}  Won: ${totals['won']}  Lost: ${totals['lost']}  Net: ${totals['net']}")
+    if args.jackpot:
+        print(f"Jackpots: {totals['jackpots']}  Paid: ${totals['jackpot_paid']}  Pool: ${JackpotPool(args.jackpot).value()}")
+    for outcome, count in sorted(totals["histogram"].items()):
+        print(f"  {outcome}: {count}")
@@ -0,0 +1,191 @@
+"""Latency and throughput benchmarks for the engine, persistence and server."""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+from accounts import AccountStore
+from engine import SCRATCH_PRICE, draw_card, evaluate_card, evaluate_spin, spin
+from ledger import Ledger
+from persistence import load_state, save_state
+from rng import FastRNG, SecureRNG
+from server import GameServer
+
+RESULTS_FILE = "bench_results.json"
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns, elapsed, alloc_bytes=None):
+    latencies_ns.sort()
+    return {
+        "rounds": len(latencies_ns),
+        "p50_us": percentile(latencies_ns, 0.50) / 1000,
+        "p95_us": percentile(latencies_ns, 0.95) / 1000,
+        "p99_us": percentile(latencies_ns, 0.99) / 1000,
+        "throughput": len(latencies_ns) / elapsed,
+        "alloc_bytes_per_round": alloc_bytes,
+    }
+
+
+def allocations_per_call(function, calls=200):
+    # pico de memoria asignada (incluye temporales) de cada llamada, en promedio
+    tracemalloc.start()
+    total = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        function()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / calls
+
+
+def measure(function, rounds):
+    latencies = []
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for _ in range(rounds):
+        t0 = clock()
+        function()
+        latencies.append(clock() - t0)
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, allocations_per_call(function))
+
+
+def bench_engine(rounds, rng):
+    spin_symbols = spin(10, rng).symbols
+    card_symbols = draw_card(rng).symbols
+    return {
+        "engine.spin": measure(lambda: spin(10, rng), rounds),
+        "engine.draw_card": measure(lambda: draw_card(rng), rounds),
+        "engine.evaluate_spin": measure(lambda: evaluate_spin(spin_symbols, 10), rounds),
+        "engine.evaluate_card": measure(lambda: evaluate_card(card_symbols, SCRATCH_PRICE), rounds),
+    }
+
+
+def bench_rng(rounds, seed):
+    symbols = list(range(5))
+    shared = random.Random(seed)
+    fast = FastRNG(seed)
+    secure = SecureRNG()
+    return {
+        "rng.random_choice": measure(lambda: shared.choice(symbols), rounds),
+        "rng.fast_choice": measure(lambda: fast.choice(symbols), rounds),
+        "rng.fast_indices_x9": measure(lambda: fast.indices(5, 9), rounds),
+        "rng.secure_choice": measure(lambda: secure.choice(symbols), rounds),
+    }
+
+
+def bench_persistence(rounds, workdir):
+    path = os.path.join(workdir, "casino_data.json")
+    data = {"balance": 1000, "total_won": 0, "total_lost": 0, "theme": "light"}
+    results = {
+        "persistence.save_state": measure(lambda: save_state(data, path), rounds),
+        "persistence.load_state": measure(lambda: load_state(path), rounds),
+    }
+
+    ledger = Ledger(os.path.join(workdir, "casino_ledger.jsonl"))
+    ledger.recover()
+    results["ledger.append"] = measure(lambda: ledger.append("slot", 10, 20, True, 1020), rounds)
+    ledger.close()
+
+    store = AccountStore(os.path.join(workdir, "casino_accounts.db"))
+    store.open_account("bench", 10 ** 12)
+    results["accounts.settle"] = measure(lambda: store.settle("bench", 10, 20, 0), rounds)
+    store.close()
+    return results
+
+
+async def _load_generator(port, clients, requests):
+    latencies = []
+
+    async def client(index):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        request = json.dumps({"op": "spin", "player": f"bench-{index}", "bet": 1}).encode("utf-8") + b"\n"
+        clock = time.perf_counter_ns
+        for _ in range(requests):
+            t0 = clock()
+            writer.write(request)
+            await reader.readline()
+            latencies.append(clock() - t0)
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def _bench_server(workdir, clients, requests):
+    game_server = GameServer(AccountStore(os.path.join(workdir, "server_accounts.db")))
+    server = await game_server.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        latencies, elapsed = await _load_generator(port, clients, requests)
+    finally:
+        server.close()
+        await server.wait_closed()
+        game_server.close()
+    return summarize(latencies, elapsed)
+
+
+def bench_server(workdir, clients, requests):
+    return {f"server.spin_x{clients}": asyncio.run(_bench_server(workdir, clients, requests))}
+
+
+def compare(previous, current):
+    for name, stats in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if old is None:
+            continue
+        change = (stats["p50_us"] - old["p50_us"]) / old["p50_us"] * 100
+        speed = (stats["throughput"] - old["throughput"]) / old["throughput"] * 100
+        print(f"{name:28} p50 {change:+7.1f}%  throughput {speed:+7.1f}%")
+
+
+def run(rounds=20000, clients=100, requests=50, seed=0):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        results.update(bench_rng(rounds, seed))
+        results.update(bench_engine(rounds, FastRNG(seed)))
+        results.update(bench_persistence(min(rounds, 2000), workdir))
+        results.update(bench_server(workdir, clients, requests))
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the casino games.")
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--compare", default=None, help="previous results file")
+    args = parser.parse_args()
+
+    report = run(args.rounds, args.clients, args.requests)
+    for name, stats in report["results"].items():
+        allocs = stats["alloc_bytes_per_round"]
+        allocs = "-" if allocs is None else f"{allocs:.0f} B"
+        print(f"{name:28} p50 {stats['p50_us']:9.2f}us  p95 {stats['p95_us']:9.2f}us  "
+              f"p99 {stats['p99_us']:9.2f}us  {stats['throughput']:12,.0f}/s  {allocs}")
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            compare(json.load(file), report)
+
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
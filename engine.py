@@ -0,0 +1,76 @@
+"""Game logic for the slot machine and the scratch card, without any Tk."""
+import random
+from collections import namedtuple
+
+from paytable import load_paytables
+
+INITIAL_MONEY = 1000
+
+PAYTABLES = load_paytables()
+PAYTABLE_VERSION = PAYTABLES["version"]
+SYMBOLS = PAYTABLES["symbols"]
+SYMBOL_INDEX = {symbol: i for i, symbol in enumerate(SYMBOLS)}
+
+SLOT_TABLE = PAYTABLES["slot"]
+SCRATCH_TABLE = PAYTABLES["scratch"]
+SLOT_REELS = SLOT_TABLE.cells
+SCRATCH_ROWS = SCRATCH_TABLE.rows
+SCRATCH_COLS = SCRATCH_TABLE.columns
+SCRATCH_PRICE = SCRATCH_TABLE.price  # cuanto cuestan los rasca y gana
+
+SpinResult = namedtuple("SpinResult", ["symbols", "bet", "unique", "max_count", "winnings", "lost", "delta", "indices"])
+CardResult = namedtuple("CardResult", ["symbols", "bet", "max_count", "winnings", "lost", "delta", "indices"])
+
+
+def settle(table, outcome, bet):
+    winnings = bet * outcome.multiplier
+    lost = 0 if winnings and table.bet_kept_on_win else bet
+    return winnings, lost
+
+
+def spin_from_indices(indices, bet, table=SLOT_TABLE):
+    outcome = table.evaluate(indices)
+    winnings, lost = settle(table, outcome, bet)
+    symbols = [table.symbols[i] for i in indices]
+    return SpinResult(symbols, bet, outcome.unique, outcome.max_count, winnings, lost, winnings - lost, indices)
+
+
+def card_from_indices(indices, bet=None, table=SCRATCH_TABLE):
+    if bet is None:
+        bet = table.price
+    outcome = table.evaluate(indices)
+    winnings, lost = settle(table, outcome, bet)
+    cells = [table.symbols[i] for i in indices]
+    columns = table.columns
+    symbols = [cells[i:i + columns] for i in range(0, len(cells), columns)]
+    return CardResult(symbols, bet, outcome.max_count, winnings, lost, winnings - lost, indices)
+
+
+def evaluate_spin(symbols, bet):
+    return spin_from_indices([SYMBOL_INDEX[symbol] for symbol in symbols], bet)
+
+
+def evaluate_card(symbols, bet=SCRATCH_PRICE):
+    return card_from_indices([SYMBOL_INDEX[symbol] for row in symbols for symbol in row], bet)
+
+
+def draw_indices(rng, table, count):
+    # los generadores de rng.py entregan indices por bloques; random solo tiene choice()
+    indices = getattr(rng, "indices", None)
+    if indices is None:
+        choice = rng.choice
+        draw_map = table.draw_map
+        return [choice(draw_map) for _ in range(count)]
+    drawn = indices(table.draw_range, count)
+    if table.uniform:
+        return drawn
+    draw_map = table.draw_map
+    return [draw_map[i] for i in drawn]
+
+
+def spin(bet, rng=random, table=SLOT_TABLE):
+    return spin_from_indices(draw_indices(rng, table, table.cells), bet, table)
+
+
+def draw_card(rng=random, bet=None, table=SCRATCH_TABLE):
+    return card_from_indices(draw_indices(rng, table, table.cells), bet, table)
@@ -0,0 +1,93 @@
+"""Bounded round history of the session, packed into arrays, with running stats."""
+from array import array
+
+GAMES = ["slot", "scratch"]
+GAME_IDS = {game: i for i, game in enumerate(GAMES)}
+DEFAULT_CAPACITY = 1_000_000
+EMPTY_CELL = 255
+
+
+class GameStats:
+    __slots__ = ("rounds", "wins", "staked", "returned", "streak", "best_streak", "worst_streak")
+
+    def __init__(self):
+        self.rounds = 0
+        self.wins = 0
+        self.staked = 0
+        self.returned = 0
+        self.streak = 0  # positiva si son rondas ganadas seguidas, negativa si son perdidas
+        self.best_streak = 0
+        self.worst_streak = 0
+
+    def add(self, bet, payout, is_win):
+        self.rounds += 1
+        self.staked += bet
+        self.returned += payout
+        if is_win:
+            self.wins += 1
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.best_streak = max(self.best_streak, self.streak)
+        else:
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            self.worst_streak = min(self.worst_streak, self.streak)
+
+    def rtp(self):
+        return self.returned / self.staked if self.staked else None
+
+    def win_rate(self):
+        return self.wins / self.rounds if self.rounds else None
+
+
+class RoundHistory:
+    # cada ronda ocupa 1 + 8 + 8 + cells bytes; al llenarse se pisan las mas viejas
+    def __init__(self, cells, capacity=DEFAULT_CAPACITY):
+        self.cells = cells
+        self.capacity = capacity
+        self.games = array("B")
+        self.bets = array("q")
+        self.payouts = array("q")
+        self.symbols = array("B")
+        self.head = 0
+        self.total = 0
+        self.stats = {game: GameStats() for game in GAMES}
+
+    def __len__(self):
+        return len(self.games)
+
+    def add(self, game, bet, payout, indices, is_win):
+        # payout es lo que vuelve al jugador en la ronda, incluida la apuesta si se conserva
+        cells = array("B", indices)
+        cells.extend([EMPTY_CELL] * (self.cells - len(cells)))
+        if len(self.games) < self.capacity:
+            self.games.append(GAME_IDS[game])
+            self.bets.append(bet)
+            self.payouts.append(payout)
+            self.symbols.extend(cells)
+        else:
+            position = self.head
+            self.games[position] = GAME_IDS[game]
+            self.bets[position] = bet
+            self.payouts[position] = payout
+            self.symbols[position * self.cells:(position + 1) * self.cells] = cells
+            self.head = (position + 1) % self.capacity
+        self.total += 1
+        self.stats[game].add(bet, payout, is_win)
+
+    def add_result(self, game, result):
+        self.add(game, result.bet, result.bet + result.delta, result.indices, result.winnings > 0)
+
+    def record(self, i):
+        # i = 0 es la ronda mas vieja que sigue guardada
+        if not 0 <= i < len(self.games):
+            raise IndexError(i)
+        position = (self.head + i) % len(self.games)
+        cells = self.symbols[position * self.cells:(position + 1) * self.cells]
+        indices = [index for index in cells if index != EMPTY_CELL]
+        return GAMES[self.games[position]], self.bets[position], self.payouts[position], indices
+
+    def recent(self, count):
+        size = len(self.games)
+        return [self.record(i) for i in range(max(0, size - count), size)]
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in (self.games, self.bets, self.payouts, self.symbols))
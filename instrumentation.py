@@ -0,0 +1,195 @@
+"""Opt-in timers, counters and profiling captures for the game rounds.
+
+Nothing is measured until hooks are installed with wrap(): the original
+functions stay in place while instrumentation is off, so it costs nothing.
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+METRICS_FILE = "casino_metrics.json"
+PROFILE_FILE = "casino_profile"
+CAPTURE_MODES = ("cprofile", "sample")
+_MISSING = object()
+
+
+class SamplingProfiler:
+    # muestrea la pila del hilo principal cada `interval` segundos desde otro hilo
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = {}
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            time.sleep(self.interval)
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def dump(self, path):
+        # formato de pilas colapsadas, el que leen flamegraph.pl y speedscope
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                file.write(f"{stack} {count}\n")
+
+
+class Instrumentation:
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}  # fase -> [llamadas, ns totales, ns maximo]
+        self.patches = []
+        self.capture = None
+        self.capture_rounds = 0
+        self.capture_path = None
+        self.export_task = None
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, phase, elapsed_ns):
+        timer = self.timers.get(phase)
+        if timer is None:
+            timer = self.timers[phase] = [0, 0, 0]
+        timer[0] += 1
+        timer[1] += elapsed_ns
+        if elapsed_ns > timer[2]:
+            timer[2] = elapsed_ns
+
+    def wrap(self, owner, attribute, phase=None, counter=None, after=None):
+        original = getattr(owner, attribute)
+        clock = time.perf_counter_ns
+        observe = self.observe
+        count = self.count
+
+        def instrumented(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                if phase is not None:
+                    observe(phase, clock() - start)
+                if counter is not None:
+                    count(counter)
+                if after is not None:
+                    after()
+
+        self.patches.append((owner, attribute, vars(owner).get(attribute, _MISSING)))
+        setattr(owner, attribute, instrumented)
+
+    def unwrap_all(self):
+        for owner, attribute, previous in reversed(self.patches):
+            if previous is _MISSING:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, previous)
+        self.patches = []
+
+    def round_done(self):
+        self.count("rounds")
+        if self.capture is not None:
+            self.capture_rounds -= 1
+            if self.capture_rounds <= 0:
+                self.stop_capture()
+
+    def start_capture(self, rounds, mode="cprofile", path=None):
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"El modo de captura debe ser uno de {CAPTURE_MODES}")
+        if self.capture is not None:
+            self.stop_capture()
+        extension = ".prof" if mode == "cprofile" else ".folded"
+        self.capture_path = path or PROFILE_FILE + extension
+        self.capture_rounds = rounds
+        self.capture = cProfile.Profile() if mode == "cprofile" else SamplingProfiler()
+        if mode == "cprofile":
+            self.capture.enable()
+        else:
+            self.capture.start()
+
+    def stop_capture(self):
+        capture, self.capture = self.capture, None
+        if capture is None:
+            return None
+        if isinstance(capture, cProfile.Profile):
+            capture.disable()
+            capture.dump_stats(self.capture_path)
+        else:
+            capture.stop()
+            capture.dump(self.capture_path)
+        return self.capture_path
+
+    def snapshot(self):
+        return {
+            "timestamp": time.time(),
+            "counters": dict(self.counters),
+            "timers": {
+                phase: {
+                    "calls": calls,
+                    "total_ms": total / 1e6,
+                    "mean_us": total / calls / 1e3,
+                    "max_us": longest / 1e3,
+                }
+                for phase, (calls, total, longest) in self.timers.items()
+            },
+        }
+
+    def prometheus(self):
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = f"casino_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        if self.timers:
+            lines.append("# TYPE casino_phase_seconds summary")
+            for phase, (calls, total, longest) in sorted(self.timers.items()):
+                lines.append(f'casino_phase_seconds_count{{phase="{phase}"}} {calls}')
+                lines.append(f'casino_phase_seconds_sum{{phase="{phase}"}} {total / 1e9:.9f}')
+            lines.append("# TYPE casino_phase_seconds_max gauge")
+            for phase, (calls, total, longest) in sorted(self.timers.items()):
+                lines.append(f'casino_phase_seconds_max{{phase="{phase}"}} {longest / 1e9:.9f}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=METRICS_FILE):
+        # .prom se escribe en formato de texto de Prometheus, el resto como JSON
+        if path.endswith(".prom"):
+            text = self.prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2)
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+    def export_every(self, root, interval_ms, path=METRICS_FILE):
+        def run():
+            self.export(path)
+            self.export_task = root.after(interval_ms, run)
+
+        self.export_task = root.after(interval_ms, run)
+
+    def close(self, path=None):
+        self.stop_capture()
+        if path is not None:
+            self.export(path)
+        self.unwrap_all()
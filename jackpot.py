@@ -0,0 +1,256 @@
+"""Progressive jackpot funded by a slice of every bet, shared across processes.
+
+Every producer (a window, a batch worker) adds contributions to its own
+shard in memory and periodically writes the shard total to its own file,
+so placing a bet never takes a lock. The pool is the sum of all shard
+files; awards are serialized with a file lock and appended to a log with
+an idempotency key, so each winning round is paid exactly once. Each pool
+reads the award log incrementally from where it left off. After an award
+the pool starts again from the seed:
+
+    pool = seed * (awards + 1) + contributions - paid
+
+Shards of closed or dead producers are folded into one file under the
+lock, so the shard directory only holds the producers that are running.
+"""
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from engine import SCRATCH_TABLE
+
+JACKPOT_FILE = "casino_jackpot"
+UNITS_PER_DOLLAR = 10_000
+CONTRIBUTION_BP = 100  # 1% de cada apuesta, en centesimos de punto porcentual
+SEED = 1000
+FLUSH_INTERVAL = 1.0
+LOCK_TIMEOUT = 10.0
+
+
+def triggers_jackpot(game, result):
+    # el progresivo lo gana la tarjeta con todas las celdas iguales
+    return game == "scratch" and result.max_count == SCRATCH_TABLE.cells
+
+
+class FileLock:
+    # flock donde existe; si no, un archivo creado con O_EXCL
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            return self
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                self.fd = os.open(self.path + ".held", os.O_CREAT | os.O_EXCL | os.O_RDWR)
+                return self
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"No se pudo tomar el candado {self.path}")
+                time.sleep(0.001)
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+        else:
+            os.close(self.fd)
+            os.remove(self.path + ".held")
+        self.fd = None
+
+
+def _write_atomic(path, data):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class JackpotPool:
+    def __init__(self, path=JACKPOT_FILE, shard=None, contribution_bp=CONTRIBUTION_BP, seed=SEED,
+                 flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.shards_dir = path + ".shards"
+        self.folded_path = path + ".folded.json"
+        self.awards_path = path + ".awards.jsonl"
+        self.lock_path = path + ".lock"
+        self.shard = shard or f"pid-{os.getpid()}"
+        self.shard_path = os.path.join(self.shards_dir, self.shard + ".json")
+        self.contribution_bp = contribution_bp
+        self.seed_units = seed * UNITS_PER_DOLLAR
+        self.flush_interval = flush_interval
+        # toda escritura de este pozo pasa por aqui, sea del hilo principal o de un executor
+        self.write_lock = threading.Lock()
+        os.makedirs(self.shards_dir, exist_ok=True)
+
+        self.contributed = 0
+        self.rounds = 0
+        self.flushed = 0
+        self.last_flush = time.monotonic()
+        # premios ya leidos del log; solo se lee lo que se agrego despues de award_offset
+        self.awards_lock = threading.Lock()
+        self.award_offset = 0
+        self.award_count = 0
+        self.paid_units = 0
+        self.award_keys = {}
+        # un shard con nuestro nombre es de un proceso anterior: se suma al acumulado y se empieza de cero
+        with FileLock(self.lock_path):
+            self._fold([self.shard] + self._dead_shards())
+
+    def _read_folded(self):
+        try:
+            with open(self.folded_path, "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"contributed": 0, "folded": {}}
+
+    def _dead_shards(self):
+        # solo en POSIX se puede preguntar si un pid sigue vivo sin tocar el proceso
+        if os.name != "posix":
+            return []
+        dead = []
+        for name in os.listdir(self.shards_dir):
+            if not (name.startswith("pid-") and name.endswith(".json")):
+                continue
+            try:
+                os.kill(int(name[4:-5]), 0)
+            except ProcessLookupError:
+                dead.append(name[:-5])
+            except (ValueError, PermissionError):
+                continue
+        return dead
+
+    def _fold(self, shards):
+        # se llama con el candado tomado; el shard queda anotado en el acumulado antes de
+        # borrarse, asi una caida a mitad de camino no lo cuenta dos veces
+        folded = self._read_folded()
+        for shard in shards:
+            path = os.path.join(self.shards_dir, shard + ".json")
+            if shard in folded["folded"] or not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r") as file:
+                    contributed = json.load(file)["contributed"]
+            except (OSError, ValueError, KeyError):
+                print(f"Shard del jackpot ilegible: {path}")
+                os.replace(path, path + ".corrupt")
+                continue
+            folded["contributed"] += contributed
+            folded["folded"][shard] = contributed
+        with self.write_lock:
+            _write_atomic(self.folded_path, folded)
+            for shard in list(folded["folded"]):
+                try:
+                    os.remove(os.path.join(self.shards_dir, shard + ".json"))
+                except FileNotFoundError:
+                    pass
+                del folded["folded"][shard]
+            _write_atomic(self.folded_path, folded)
+
+    def contribute(self, bet):
+        # camino caliente: solo suma en memoria, sin candados ni disco
+        self.contributed += bet * self.contribution_bp
+        self.rounds += 1
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= self.flush_interval
+
+    def claim_flush(self):
+        # quien recibe True hace el flush, aunque sea en otro hilo; el resto no lo repite
+        if not self.due():
+            return False
+        self.last_flush = time.monotonic()
+        return True
+
+    def maybe_flush(self):
+        if self.claim_flush():
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        with self.write_lock:
+            contributed, rounds = self.contributed, self.rounds
+            if contributed == self.flushed:
+                return
+            _write_atomic(self.shard_path, {"shard": self.shard, "contributed": contributed, "rounds": rounds})
+            self.flushed = contributed
+
+    def total_contributed(self):
+        folded = self._read_folded()
+        total = folded["contributed"] + self.contributed
+        for name in os.listdir(self.shards_dir):
+            if not name.endswith(".json"):
+                continue
+            shard = name[:-5]
+            if shard == self.shard or shard in folded["folded"]:
+                continue
+            try:
+                with open(os.path.join(self.shards_dir, name), "r") as file:
+                    total += json.load(file)["contributed"]
+            except (OSError, ValueError, KeyError):
+                continue  # otro proceso lo esta reemplazando; entra en la proxima lectura
+        return total
+
+    def read_awards(self):
+        # el log solo crece: cada lectura sigue desde donde quedo la anterior
+        with self.awards_lock:
+            try:
+                with open(self.awards_path, "rb") as file:
+                    file.seek(self.award_offset)
+                    for line in file:
+                        if not line.endswith(b"\n"):
+                            break  # otro proceso lo esta escribiendo
+                        award = json.loads(line)
+                        self.award_keys[award["key"]] = award["amount"]
+                        self.award_count += 1
+                        self.paid_units += award["paid_units"]
+                        self.award_offset += len(line)
+            except FileNotFoundError:
+                pass
+            return self.award_count, self.paid_units
+
+    def _pool_units(self, count, paid):
+        return self.seed_units * (count + 1) + self.total_contributed() - paid
+
+    def value(self):
+        return self._pool_units(*self.read_awards()) // UNITS_PER_DOLLAR
+
+    def award(self, key):
+        # la misma clave devuelve siempre el mismo premio, aunque se pida otra vez
+        with FileLock(self.lock_path):
+            count, paid = self.read_awards()
+            if key in self.award_keys:
+                return self.award_keys[key]
+            self.flush()
+            amount = self._pool_units(count, paid) // UNITS_PER_DOLLAR
+            record = {
+                "key": key,
+                "amount": amount,
+                "paid_units": amount * UNITS_PER_DOLLAR,
+                "shard": self.shard,
+                "time": time.time(),
+            }
+            with open(self.awards_path, "a") as file:
+                file.write(json.dumps(record) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            return amount
+
+    def close(self):
+        # lo aportado pasa al acumulado y el shard desaparece
+        self.flush()
+        with FileLock(self.lock_path):
+            self._fold([self.shard])
+        self.contributed = self.flushed = self.rounds = 0
@@ -0,0 +1,128 @@
+"""Append-only ledger of balance changes with group commit and snapshots."""
+import json
+import os
+import time
+
+LEDGER_FILE = "casino_ledger.jsonl"
+FSYNC_MODES = ("always", "batch", "never")
+
+
+class Ledger:
+    def __init__(self, path=LEDGER_FILE, snapshot_path=None, batch_size=64,
+                 flush_interval=1.0, fsync="batch", snapshot_every=10000):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync debe ser uno de {FSYNC_MODES}")
+        self.path = path
+        self.snapshot_path = snapshot_path or os.path.splitext(path)[0] + ".snapshot.json"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.snapshot_every = snapshot_every
+
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.since_snapshot = 0
+        self.state = None
+        self.file = None
+
+    def recover(self):
+        # ultimo snapshot + la cola del ledger escrita despues de el
+        state = {"balance": None, "total_won": 0, "total_lost": 0, "records": 0, "offset": 0}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as file:
+                state.update(json.load(file))
+
+        offset = state["offset"]
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        restart = offset > size
+        if restart:
+            # el ledger falta o es mas corto que el snapshot: el snapshot manda y se empieza
+            # un ledger vacio; el archivo viejo se aparta entero, nunca se trunca
+            if os.path.exists(self.path):
+                os.rename(self.path, f"{self.path}.orphaned-{int(time.time() * 1000)}")
+            offset = 0
+        elif os.path.exists(self.path):
+            with open(self.path, "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break  # escritura incompleta de una caida
+                    self._apply(state, json.loads(line))
+                    offset += len(line)
+                    self.since_snapshot += 1
+        state["offset"] = offset
+
+        self._open(offset)
+        self.state = state
+        if restart:
+            self._snapshot()
+        if state["balance"] is None:
+            return None
+        return state
+
+    def append(self, game, bet, delta, is_win, balance):
+        if self.state is None:
+            self.recover()
+        record = {
+            "ts": time.time(),
+            "game": game,
+            "bet": bet,
+            "outcome": "win" if is_win else "loss",
+            "delta": delta,
+            "balance": balance,
+        }
+        self._apply(self.state, record)
+        self.buffer.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if self.fsync == "always" or len(self.buffer) >= self.batch_size:
+            self.flush()
+        elif time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        data = "".join(self.buffer).encode("utf-8")
+        self.since_snapshot += len(self.buffer)
+        self.buffer = []
+        self.file.write(data)
+        self.file.flush()
+        if self.fsync != "never":
+            os.fsync(self.file.fileno())
+        self.state["offset"] += len(data)
+
+        if self.since_snapshot >= self.snapshot_every:
+            self._snapshot()
+
+    def _snapshot(self):
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.state, file)
+            file.flush()
+            if self.fsync != "never":
+                os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self.since_snapshot = 0
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+    def _open(self, offset):
+        self.file = open(self.path, "ab")
+        # descarta una linea a medio escribir para no mezclarla con la siguiente
+        if self.file.tell() != offset:
+            self.file.truncate(offset)
+
+    @staticmethod
+    def _apply(state, record):
+        delta = record["delta"]
+        if record["outcome"] == "win" and delta > 0:
+            state["total_won"] += delta
+        elif record["outcome"] == "loss" and delta < 0:
+            state["total_lost"] -= delta
+        state["balance"] = record["balance"]
+        state["records"] += 1
@@ -0,0 +1,208 @@
+"""Responsible-gaming limits: rolling loss limits, session time caps and cool-downs.
+
+Losses are kept in ring buffers of time buckets, so the loss over the last
+hour or day is a running total that costs O(1) to update and to read, no
+matter how many rounds were played. Windows move one bucket at a time
+(one minute for the hourly limit, fifteen for the daily one).
+
+check() only reads the state, so a refused bet changes nothing. Sessions
+start and end in record(), and the cool-down is derived from the start of
+the session that reached its cap.
+"""
+import math
+import threading
+import time
+
+from persistence import load_state, save_state
+
+LIMITS_FILE = "casino_limits.json"
+HOUR = 3600
+DAY = 24 * HOUR
+HOUR_BUCKETS = 60
+DAY_BUCKETS = 96
+COOLDOWN = 15 * 60
+SESSION_GAP = 30 * 60  # tras esta pausa sin jugar empieza una sesion nueva
+SAVE_INTERVAL = 2.0
+
+
+class RollingSum:
+    def __init__(self, window, buckets):
+        self.width = window / buckets
+        self.sums = [0] * buckets
+        self.head = None  # numero absoluto de la cubeta mas reciente
+        self.total = 0
+
+    def advance(self, now):
+        # vacia las cubetas que salieron de la ventana; cada una se limpia una vez por vuelta
+        bucket = int(now // self.width)
+        size = len(self.sums)
+        if self.head is None or bucket - self.head >= size:
+            self.sums = [0] * size
+            self.total = 0
+            self.head = bucket
+        elif bucket > self.head:
+            for expired in range(self.head + 1, bucket + 1):
+                slot = expired % size
+                self.total -= self.sums[slot]
+                self.sums[slot] = 0
+            self.head = bucket
+        return self.head % size
+
+    def add(self, now, amount):
+        slot = self.advance(now)
+        self.sums[slot] += amount
+        self.total += amount
+
+    def value(self, now):
+        self.advance(now)
+        return self.total
+
+    def to_dict(self):
+        return {"head": self.head, "sums": list(self.sums)}
+
+    def restore(self, state):
+        if len(state["sums"]) != len(self.sums):
+            return  # otra resolucion de cubetas: se empieza de cero
+        self.head = state["head"]
+        self.sums = list(state["sums"])
+        self.total = sum(self.sums)
+
+
+class Limits:
+    def __init__(self, hourly_loss=None, daily_loss=None, session_minutes=None, cooldown_minutes=None):
+        self.hourly_loss = hourly_loss
+        self.daily_loss = daily_loss
+        self.session_minutes = session_minutes
+        self.cooldown_minutes = cooldown_minutes
+        self.hourly = RollingSum(HOUR, HOUR_BUCKETS)
+        self.daily = RollingSum(DAY, DAY_BUCKETS)
+        self.session_start = None
+        self.last_activity = None
+
+    def settings(self):
+        return {
+            "hourly_loss": self.hourly_loss,
+            "daily_loss": self.daily_loss,
+            "session_minutes": self.session_minutes,
+            "cooldown_minutes": self.cooldown_minutes,
+        }
+
+    def configure(self, **settings):
+        for name, value in settings.items():
+            if name not in self.settings():
+                raise ValueError(f"Límite desconocido: {name}")
+            if value is not None and value < 0:
+                raise ValueError("Los límites no pueden ser negativos")
+            setattr(self, name, value)
+
+    def cooldown_seconds(self):
+        return COOLDOWN if self.cooldown_minutes is None else self.cooldown_minutes * 60
+
+    def session_ends(self, now):
+        # (fin de la sesion en curso, fin de su pausa), o None si la proxima ronda abre otra;
+        # una sesion que llego al tope dura hasta el fin de la pausa, aunque no se juegue
+        if self.session_start is None or self.last_activity is None:
+            return None
+        ends = resume = math.inf
+        if self.session_minutes is not None:
+            ends = self.session_start + self.session_minutes * 60
+            resume = ends + self.cooldown_seconds()
+        if self.last_activity + SESSION_GAP >= ends:
+            return (ends, resume) if now < resume else None
+        return (ends, resume) if now - self.last_activity <= SESSION_GAP else None
+
+    def check(self, bet, now=None):
+        # devuelve por que no se puede apostar, o None si la apuesta esta permitida;
+        # se cuenta la apuesta como si se perdiera entera
+        if now is None:
+            now = time.time()
+        session = self.session_ends(now)
+        if session is not None and now >= session[0]:
+            minutes = math.ceil((session[1] - now) / 60)
+            return (f"Llegaste al límite de {self.session_minutes} min por sesión. "
+                    f"Podrás volver a jugar en {minutes} min.")
+
+        if self.hourly_loss is not None and self.hourly.value(now) + bet > self.hourly_loss:
+            return f"Esta apuesta superaría tu límite de pérdidas por hora (${self.hourly_loss})."
+        if self.daily_loss is not None and self.daily.value(now) + bet > self.daily_loss:
+            return f"Esta apuesta superaría tu límite de pérdidas por día (${self.daily_loss})."
+        return None
+
+    def record(self, delta, now=None):
+        # las ganancias descuentan de la perdida neta de la ventana
+        if now is None:
+            now = time.time()
+        self.hourly.add(now, -delta)
+        self.daily.add(now, -delta)
+        # una ronda aceptada justo antes del tope sigue en su sesion, y la pausa corre igual
+        if self.session_ends(now) is None:
+            self.session_start = now
+        self.last_activity = now
+
+    def state(self):
+        return {
+            "settings": self.settings(),
+            "hourly": self.hourly.to_dict(),
+            "daily": self.daily.to_dict(),
+            "session_start": self.session_start,
+            "last_activity": self.last_activity,
+        }
+
+    def restore(self, state):
+        self.configure(**state.get("settings", {}))
+        if "hourly" in state:
+            self.hourly.restore(state["hourly"])
+        if "daily" in state:
+            self.daily.restore(state["daily"])
+        self.session_start = state.get("session_start")
+        self.last_activity = state.get("last_activity")
+
+
+class PlayerLimits:
+    # limites de cada jugador del servidor, con la misma configuracion para todos
+    def __init__(self, path=LIMITS_FILE, save_interval=SAVE_INTERVAL, **settings):
+        self.path = path
+        self.settings = settings
+        self.save_interval = save_interval
+        self.players = {}
+        # ultimo estado guardado de cada jugador; solo lo modifica save(), bajo save_lock
+        self.states = {}
+        self.dirty = set()
+        self.save_lock = threading.Lock()
+        self.last_save = time.monotonic()
+        data = load_state(path)
+        if data is not None:
+            self.states = data.get("players", {})
+
+    def get(self, player_id):
+        limits = self.players.get(player_id)
+        if limits is None:
+            limits = Limits()
+            state = self.states.get(player_id)
+            if state is not None:
+                limits.restore(state)
+            limits.configure(**self.settings)
+            self.players[player_id] = limits
+        return limits
+
+    def record(self, player_id, delta, now=None):
+        self.get(player_id).record(delta, now)
+        self.dirty.add(player_id)
+
+    def due(self):
+        return bool(self.dirty) and time.monotonic() - self.last_save >= self.save_interval
+
+    def snapshot(self):
+        # se copia en el hilo que modifica los limites, y solo lo de quienes jugaron;
+        # la escritura puede ir a otro hilo
+        changes = {player_id: self.players[player_id].state() for player_id in self.dirty}
+        self.dirty = set()
+        self.last_save = time.monotonic()
+        return changes
+
+    def save(self, changes=None):
+        if changes is None:
+            changes = self.snapshot()
+        with self.save_lock:
+            self.states.update(changes)
+            save_state({"players": self.states}, self.path)
@@ -0,0 +1,176 @@
+"""Memory-mapped reader of the binary round log for large history analysis.
+
+The records are mapped as a NumPy structured array, so columns are
+zero-copy views and aggregates run chunk by chunk over the mapping. A
+sidecar .idx file keeps, per block of records, its time range and rounds
+per game.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from history import GAME_IDS, GAMES
+from sessionlog import HEADER, HEADER_SIZE, MAGIC, MAX_CELLS, SESSION_LOG_FILE
+
+BLOCK_RECORDS = 1 << 16
+CHUNK_RECORDS = 1 << 22
+
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("bet", "<i8"),
+    ("payout", "<i8"),
+    ("balance", "<i8"),
+    ("game", "u1"),
+    ("n_cells", "u1"),
+    ("cells", "u1", (MAX_CELLS,)),
+])
+INDEX_DTYPE = np.dtype([
+    ("first_time", "<f8"),
+    ("last_time", "<f8"),
+    ("counts", "<i8", (len(GAMES),)),
+])
+
+
+class SessionLogReader:
+    def __init__(self, path=SESSION_LOG_FILE, index_path=None):
+        self.path = path
+        self.index_path = index_path or path + ".idx"
+        with open(path, "rb") as file:
+            magic, record_size, cells = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or record_size != RECORD_DTYPE.itemsize or cells != MAX_CELLS:
+            raise ValueError(f"{path} no es un registro de sesiones compatible")
+
+        # un registro incompleto al final se ignora
+        count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        self._index = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        return self.records[name]
+
+    def index(self):
+        # los bloques completos se guardan en disco; el ultimo, incompleto, se calcula cada vez
+        if self._index is not None:
+            return self._index
+        full_blocks = len(self.records) // BLOCK_RECORDS
+        saved = np.empty(0, dtype=INDEX_DTYPE)
+        if os.path.exists(self.index_path):
+            saved = np.fromfile(self.index_path, dtype=INDEX_DTYPE)[:full_blocks]
+
+        entries = [saved]
+        for block in range(len(saved), -(-len(self.records) // BLOCK_RECORDS)):
+            records = self.records[block * BLOCK_RECORDS:(block + 1) * BLOCK_RECORDS]
+            entry = np.zeros(1, dtype=INDEX_DTYPE)
+            entry["first_time"] = records["time"][0]
+            entry["last_time"] = records["time"][-1]
+            entry["counts"] = np.bincount(records["game"], minlength=len(GAMES))[:len(GAMES)]
+            entries.append(entry)
+        index = np.concatenate(entries)
+        if full_blocks > len(saved):
+            index[:full_blocks].tofile(self.index_path)
+        self._index = index
+        return index
+
+    def time_slice(self, start_time=None, end_time=None):
+        # primero se ubica el bloque con el indice y despues el registro dentro del bloque
+        index = self.index()
+        times = self.records["time"]
+        start, stop = 0, len(self.records)
+        if start_time is not None:
+            block = max(0, int(np.searchsorted(index["last_time"], start_time, side="left")))
+            base = block * BLOCK_RECORDS
+            start = base + int(np.searchsorted(times[base:base + BLOCK_RECORDS], start_time, side="left"))
+        if end_time is not None:
+            block = int(np.searchsorted(index["first_time"], end_time, side="left"))
+            block = max(0, block - 1)
+            base = block * BLOCK_RECORDS
+            stop = base + int(np.searchsorted(times[base:base + BLOCK_RECORDS], end_time, side="left"))
+        start = min(start, len(self.records))
+        return slice(start, max(start, stop))
+
+    def select(self, game=None, start_time=None, end_time=None):
+        # sin juego el resultado es una vista; con juego, solo se copian los registros que coinciden
+        if game is None:
+            return self.records[self.time_slice(start_time, end_time)]
+        chunks = list(self.chunks(game, start_time, end_time))
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=RECORD_DTYPE)
+
+    def chunks(self, game=None, start_time=None, end_time=None, chunk_size=CHUNK_RECORDS):
+        window = self.time_slice(start_time, end_time)
+        index = self.index()
+        game_id = None if game is None else GAME_IDS[game]
+        for start in range(window.start, window.stop, chunk_size):
+            stop = min(start + chunk_size, window.stop)
+            if game_id is not None:
+                blocks = index["counts"][start // BLOCK_RECORDS:(stop - 1) // BLOCK_RECORDS + 1, game_id]
+                if not blocks.any():
+                    continue
+            records = self.records[start:stop]
+            if game_id is not None:
+                records = records[records["game"] == game_id]
+            yield records
+
+    def aggregate(self, game=None, start_time=None, end_time=None):
+        rounds = staked = returned = hits = 0
+        distribution = {}
+        for records in self.chunks(game, start_time, end_time):
+            bets = records["bet"]
+            payouts = records["payout"]
+            rounds += len(records)
+            staked += int(bets.sum())
+            returned += int(payouts.sum())
+            hits += int(np.count_nonzero(payouts))
+            # multiplo de la apuesta que vuelve al jugador, redondeado a centesimos
+            ratios, counts = np.unique(np.round(payouts / np.maximum(bets, 1), 2), return_counts=True)
+            for ratio, count in zip(ratios.tolist(), counts.tolist()):
+                distribution[ratio] = distribution.get(ratio, 0) + count
+        return {
+            "rounds": rounds,
+            "staked": staked,
+            "returned": returned,
+            "rtp": returned / staked if staked else None,
+            "hit_frequency": hits / rounds if rounds else None,
+            "distribution": dict(sorted(distribution.items())),
+        }
+
+    def balance_curve(self, points=1000, start_time=None, end_time=None):
+        # vista con paso fijo sobre la columna de saldo, sin copiar
+        window = self.time_slice(start_time, end_time)
+        step = max(1, (window.stop - window.start) // points)
+        records = self.records[window.start:window.stop:step]
+        return records["time"], records["balance"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze the binary casino round log.")
+    parser.add_argument("command", choices=["summary", "curve"])
+    parser.add_argument("path", nargs="?", default=SESSION_LOG_FILE)
+    parser.add_argument("--game", choices=GAMES, default=None)
+    parser.add_argument("--since", type=float, default=None, help="unix timestamp")
+    parser.add_argument("--until", type=float, default=None, help="unix timestamp")
+    parser.add_argument("--points", type=int, default=20)
+    args = parser.parse_args()
+
+    reader = SessionLogReader(args.path)
+    start = time.perf_counter()
+    if args.command == "summary":
+        stats = reader.aggregate(args.game, args.since, args.until)
+        elapsed = time.perf_counter() - start
+        print(f"Rounds: {stats['rounds']}  Staked: ${stats['staked']}  Returned: ${stats['returned']}")
+        if stats["rounds"]:
+            print(f"RTP: {stats['rtp']:.6f}  Hit frequency: {stats['hit_frequency']:.6f}")
+        for ratio, count in stats["distribution"].items():
+            print(f"  x{ratio:g}: {count}")
+        print(f"Scanned in {elapsed:.2f}s")
+    else:
+        times, balances = reader.balance_curve(args.points, args.since, args.until)
+        for timestamp, balance in zip(times.tolist(), balances.tolist()):
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}  ${balance}")
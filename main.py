@@ -1,12 +1,33 @@
+import argparse
 import tkinter as tk
-from tkinter import ttk, messagebox
+import tkinter.font
+from tkinter import messagebox
 import random
-import json
 import os
 import time
+import heapq
+import itertools
+import math
+import threading
+import weakref
+from collections import deque
+
+IMPORT_STARTED = time.perf_counter()
+
+import engine
+from accounts import ACCOUNTS_FILE, AccountStore
+from engine import (INITIAL_MONEY, SCRATCH_COLS, SCRATCH_PRICE, SCRATCH_ROWS, SCRATCH_TABLE, SLOT_REELS, SYMBOLS,
+                    card_from_indices, draw_card, spin)
+from history import GAMES, RoundHistory
+from jackpot import JackpotPool, triggers_jackpot
+from instrumentation import CAPTURE_MODES, METRICS_FILE, Instrumentation
+from ledger import Ledger
+from limits import Limits
+from persistence import SaveScheduler, load_state, save_state
+from replay import AuditLog
+from rng import RecordingRNG, SecureRNG
+from sessionlog import SessionLog
 
-INITIAL_MONEY = 1000
-SYMBOLS = ["🍒", "💎", "🔔", "🍋", "7️⃣"]
 THEME_COLORS = {
     "light": {
         "bg": "#f0f0f0",
@@ -24,6 +45,360 @@ THEME_COLORS = {
     }
 }
 
+RENDER_SAMPLES = 600
+
+GAME_NAMES = {"slot": "🎰 Tragamonedas", "scratch": "🎟️ Rasca y Gana"}
+
+class ThemeRegistry:
+    def __init__(self):
+        self.windows = {}
+    
+    def register(self, widget, **roles):
+        # roles: opcion del widget -> clave de THEME_COLORS, p. ej. bg="bg", fg="fg"
+        window = widget.winfo_toplevel()
+        widgets = self.windows.get(window)
+        if widgets is None:
+            widgets = self.windows[window] = {}
+            window.bind("<Destroy>", lambda event, window=window: self.forget(event, window), add="+")
+        widgets[widget] = roles
+    
+    def unregister(self, widget):
+        widgets = self.windows.get(widget.winfo_toplevel())
+        if widgets is not None:
+            widgets.pop(widget, None)
+    
+    def forget(self, event, window):
+        if event.widget is window:
+            self.windows.pop(window, None)
+    
+    def apply(self, theme):
+        palette = THEME_COLORS[theme]
+        for widgets in list(self.windows.values()):
+            for widget, roles in widgets.items():
+                widget.config(**{option: palette[role] for option, role in roles.items()})
+
+EMOJI_FONTS = (
+    "/usr/share/fonts/truetype/noto/NotoColorEmoji.ttf",
+    "/usr/share/fonts/noto/NotoColorEmoji.ttf",
+    "/usr/share/fonts/google-noto-emoji/NotoColorEmoji.ttf",
+    "/System/Library/Fonts/Apple Color Emoji.ttc",
+    "C:\\Windows\\Fonts\\seguiemj.ttf",
+)
+EMOJI_SIZES = (109, 160, 96, 64, 48, 32)  # las fuentes de mapa de bits solo cargan en sus tamaños
+
+def load_pillow():
+    # Pillow es opcional y tarda en importarse: se carga al crear el cache de glifos
+    try:
+        from PIL import Image, ImageDraw, ImageFont, ImageTk
+    except ImportError:
+        return None
+    return Image, ImageDraw, ImageFont, ImageTk
+
+class GlyphCache:
+    # cada simbolo se rasteriza una vez por tamaño de celda y las celdas cambian de imagen;
+    # sin Pillow o sin fuente de emojis las celdas siguen usando texto
+    def __init__(self, root):
+        self.root = root
+        self.images = {}
+        self.boxes = weakref.WeakKeyDictionary()  # widget -> (ancho px, alto px, ancho, alto, px del glifo)
+        self.font = None
+        self.pillow = None
+        self.loaded = False
+    
+    @property
+    def enabled(self):
+        return self.font is not None
+    
+    def load_font(self):
+        image_font = self.pillow[2]
+        paths = [os.environ["CASINO_EMOJI_FONT"]] if os.environ.get("CASINO_EMOJI_FONT") else EMOJI_FONTS
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            for size in EMOJI_SIZES:
+                try:
+                    return image_font.truetype(path, size)
+                except OSError:
+                    continue
+        return None
+    
+    def bind(self, widget):
+        # la caja en pixeles sale del tamaño que pidio el widget mientras mostraba texto
+        if not self.loaded:
+            self.loaded = True
+            self.pillow = load_pillow()
+            if self.pillow is not None:
+                self.font = self.load_font()
+        if not self.enabled:
+            return
+        # cget devuelve distancias de Tk y la fuente como texto: Tk las convierte a pixeles
+        options = ("borderwidth", "highlightthickness", "padx")
+        inset = 2 * sum(widget.winfo_pixels(widget.cget(option)) for option in options)
+        size = tkinter.font.Font(root=self.root, font=widget.cget("font")).actual("size")
+        # tamaño negativo = pixeles, positivo = puntos
+        glyph_px = -size if size < 0 else int(self.root.winfo_fpixels(f"{size}p"))
+        self.boxes[widget] = (
+            widget.winfo_reqwidth() - inset,
+            widget.winfo_reqheight() - inset,
+            widget.cget("width"),
+            widget.cget("height"),
+            glyph_px,
+        )
+        widget.config(**self.options(widget, widget.cget("text")))
+    
+    def options(self, widget, symbol):
+        box = self.boxes.get(widget)
+        image = None if box is None else self.image(symbol, box[0], box[1], box[4])
+        if image is None:
+            if box is None:
+                return {"text": symbol}
+            return {"text": symbol, "image": "", "width": box[2], "height": box[3]}
+        return {"text": "", "image": image, "width": box[0], "height": box[1]}
+    
+    def image(self, symbol, width, height, glyph_px):
+        key = (symbol, width, height, glyph_px)
+        if key not in self.images:
+            self.images[key] = self.render(symbol, width, height, glyph_px)
+        return self.images[key]
+    
+    def render(self, symbol, width, height, glyph_px):
+        image_module, image_draw, _, image_tk = self.pillow
+        left, top, right, bottom = self.font.getbbox(symbol)
+        if right <= left or bottom <= top:
+            return None
+        glyph = image_module.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+        image_draw.Draw(glyph).text((-left, -top), symbol, font=self.font, embedded_color=True)
+        
+        scale = min(glyph_px / glyph.height, width / glyph.width, height / glyph.height)
+        glyph = glyph.resize((max(1, round(glyph.width * scale)), max(1, round(glyph.height * scale))), image_module.LANCZOS)
+        # fondo transparente: la misma imagen sirve para los dos temas
+        cell = image_module.new("RGBA", (width, height), (0, 0, 0, 0))
+        cell.paste(glyph, ((width - glyph.width) // 2, (height - glyph.height) // 2), glyph)
+        return image_tk.PhotoImage(cell, master=self.root)
+
+class ClockTask:
+    __slots__ = ("owner", "due", "callback", "cancelled")
+    
+    def __init__(self, owner, due, callback):
+        self.owner = owner
+        self.due = due
+        self.callback = callback
+        self.cancelled = False
+
+class FrameClock:
+    def __init__(self, root, fps=60):
+        self.root = root
+        self.fps = fps
+        self.queue = []
+        self.sequence = itertools.count()
+        self.tasks_by_owner = {}
+        self.pending = {}
+        self.after_id = None
+        self.render_times = deque(maxlen=RENDER_SAMPLES)  # ms por frame con cambios de widgets
+        self.render_observer = None
+    
+    @property
+    def frame_ms(self):
+        return max(1, int(1000 / self.fps))
+    
+    def schedule(self, owner, delay_ms, callback):
+        if owner not in self.tasks_by_owner:
+            self.tasks_by_owner[owner] = set()
+            owner.bind("<Destroy>", lambda event, owner=owner: self.on_destroy(event, owner), add="+")
+        
+        task = ClockTask(owner, time.perf_counter() + delay_ms / 1000, callback)
+        self.tasks_by_owner[owner].add(task)
+        heapq.heappush(self.queue, (task.due, next(self.sequence), task))
+        self.wake()
+        return task
+    
+    def repeat(self, owner, interval_ms, steps, callback, done=None):
+        def run(step):
+            if step < steps:
+                callback(step)
+                self.schedule(owner, interval_ms, lambda: run(step + 1))
+            elif done is not None:
+                done()
+        
+        return self.schedule(owner, 0, lambda: run(0))
+    
+    def set(self, widget, **options):
+        # varios cambios al mismo widget en un frame se aplican una sola vez
+        self.pending.setdefault(widget, {}).update(options)
+        self.wake()
+    
+    def cancel_task(self, task):
+        task.cancelled = True
+        tasks = self.tasks_by_owner.get(task.owner)
+        if tasks is not None:
+            tasks.discard(task)
+    
+    def cancel(self, owner):
+        for task in self.tasks_by_owner.get(owner, ()):
+            task.cancelled = True
+        if owner in self.tasks_by_owner:
+            self.tasks_by_owner[owner] = set()
+    
+    def on_destroy(self, event, owner):
+        if event.widget is owner:
+            self.cancel(owner)
+            del self.tasks_by_owner[owner]
+    
+    def render_stats(self):
+        if not self.render_times:
+            return None
+        times = sorted(self.render_times)
+        return {
+            "frames": len(times),
+            "mean_ms": sum(times) / len(times),
+            "p95_ms": times[min(len(times) - 1, int(0.95 * len(times)))],
+            "max_ms": times[-1],
+        }
+    
+    def wake(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.frame_ms, self.tick)
+    
+    def tick(self):
+        self.after_id = None
+        now = time.perf_counter()
+        # solo corren las tareas que ya existian al empezar este frame
+        last = next(self.sequence)
+        while self.queue and self.queue[0][0] <= now and self.queue[0][1] < last:
+            _, _, task = heapq.heappop(self.queue)
+            if task.cancelled:
+                continue
+            self.tasks_by_owner[task.owner].discard(task)
+            task.callback()
+        
+        pending, self.pending = self.pending, {}
+        if pending:
+            # se cuenta la configuracion y el redibujado que Tk haria justo despues
+            start = time.perf_counter()
+            for widget, options in pending.items():
+                if widget.winfo_exists():
+                    widget.config(**options)
+            self.root.update_idletasks()
+            elapsed = time.perf_counter() - start
+            self.render_times.append(elapsed * 1000)
+            if self.render_observer is not None:
+                self.render_observer(elapsed)
+        
+        while self.queue and self.queue[0][2].cancelled:
+            heapq.heappop(self.queue)
+        if self.queue or self.pending:
+            self.wake()
+
+class AutoPlay:
+    FRAME_BUDGET = 0.010  # segundos de juego por frame, el resto queda para Tk
+    
+    def __init__(self, window, casino_app, play_round, render, finish, rounds, stop_on_win=False, loss_limit=None):
+        self.window = window
+        self.casino_app = casino_app
+        self.play_round = play_round
+        self.render = render
+        self.finish = finish
+        self.remaining = rounds
+        self.stop_on_win = stop_on_win
+        self.loss_limit = loss_limit
+        self.start_balance = casino_app.balance
+        self.played = 0
+        self.running = False
+        self.task = None
+    
+    def start(self):
+        self.running = True
+        self.step()
+    
+    def step(self):
+        self.task = None
+        if not self.running or not self.window.winfo_exists():
+            return
+        
+        deadline = time.perf_counter() + self.FRAME_BUDGET
+        last_result = None
+        while self.remaining > 0:
+            result = self.play_round()
+            if result is None:
+                self.remaining = 0
+                break
+            
+            last_result = result
+            self.remaining -= 1
+            self.played += 1
+            if self.stop_on_win and result.winnings:
+                self.remaining = 0
+            elif self.loss_limit is not None and self.start_balance - self.casino_app.balance >= self.loss_limit:
+                self.remaining = 0
+            
+            if time.perf_counter() >= deadline:
+                break
+        
+        # una sola actualizacion de etiquetas por frame, no por ronda
+        if last_result is not None:
+            self.render(last_result)
+        self.casino_app.refresh_labels()
+        
+        if self.remaining > 0:
+            self.task = self.casino_app.clock.schedule(self.window, 0, self.step)
+        else:
+            self.stop()
+    
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        if self.task is not None:
+            self.casino_app.clock.cancel_task(self.task)
+            self.task = None
+        if self.window.winfo_exists():
+            self.finish()
+
+def read_auto_settings(rounds_var, loss_limit_var):
+    try:
+        rounds = int(rounds_var.get())
+        loss_limit = loss_limit_var.get().strip()
+        loss_limit = int(loss_limit) if loss_limit else None
+    except ValueError:
+        messagebox.showerror("Error", "Por favor ingresa un número válido.")
+        return None
+    
+    if rounds <= 0:
+        messagebox.showerror("Error", "El número de rondas debe ser mayor a cero.")
+        return None
+    
+    return rounds, loss_limit
+
+def read_bet(bet_var, available):
+    try:
+        bet = int(bet_var.get())
+        if bet <= 0:
+            messagebox.showerror("Error", "La apuesta debe ser mayor a cero.")
+            return None
+        
+        if bet > available:
+            messagebox.showerror("Error", "No tienes suficiente saldo para esta apuesta.")
+            return None
+    except ValueError:
+        messagebox.showerror("Error", "Por favor ingresa un número válido.")
+        return None
+    
+    return bet
+
+def apply_spin_result(casino_app, result, refresh=True):
+    if result.winnings:
+        if result.max_count == SLOT_REELS:
+            result_text = f"¡GANASTE! 🎉 Todos los símbolos coinciden.\nGanancia: ${result.winnings}"
+        else:
+            result_text = f"¡GANASTE! 🎉 {result.max_count} símbolos coinciden.\nGanancia: ${result.winnings}"
+        casino_app.update_balance(result.winnings, is_win=True, game="slot", bet=result.bet, refresh=refresh)
+    else:
+        result_text = f"😢 No hay coincidencias.\nPérdida: ${result.bet}"
+        casino_app.update_balance(-result.lost, is_win=False, game="slot", bet=result.bet, refresh=refresh)
+    
+    casino_app.record_round("slot", result)
+    return result_text
+
 class SlotMachine:
     def __init__(self, parent, casino_app):
         self.parent = parent
@@ -31,18 +406,39 @@ class SlotMachine:
         
         self.window = tk.Toplevel(parent)
         self.window.title("🎰 Tragamonedas")
-        self.window.geometry("600x500")
+        self.window.geometry("600x620")
         self.window.resizable(False, False)
         self.window.config(bg=THEME_COLORS[casino_app.theme]["bg"])
         
         self.window.transient(parent)
         self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
         
         self.create_widgets()
+        self.register_theme()
         
         self.spinning = False
         self.symbols = []
-        self.after_ids = []
+        self.auto_play = None
+    
+    def show(self):
+        self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+        self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+    
+    def hide(self):
+        if self.auto_play is not None:
+            self.auto_play.stop()
+        if self.spinning:
+            # la tirada se sortea al terminar la animacion, asi que cortarla no cobra nada
+            self.casino_app.clock.cancel(self.window)
+            for label in self.symbol_labels:
+                self.casino_app.show_symbol(label, "❓")
+            self.spin_button.config(state=tk.NORMAL)
+            self.spinning = False
+        self.window.grab_release()
+        self.window.withdraw()
     
     def create_widgets(self):
         self.title_label = tk.Label(
@@ -74,7 +470,7 @@ class SlotMachine:
         self.symbols_frame.pack(pady=20)
         
         self.symbol_labels = []
-        for i in range(3):
+        for i in range(SLOT_REELS):
             label = tk.Label(
                 self.symbols_frame,
                 text="❓",
@@ -86,6 +482,7 @@ class SlotMachine:
                 fg=THEME_COLORS[self.casino_app.theme]["fg"]
             )
             label.grid(row=0, column=i, padx=10)
+            self.casino_app.glyphs.bind(label)
             self.symbol_labels.append(label)
         
         self.bet_frame = tk.Frame(
@@ -117,18 +514,103 @@ class SlotMachine:
             validatecommand=vcmd
         )
         self.bet_entry.grid(row=0, column=1, padx=5)
+        
+        self.options_frame = tk.Frame(
+            self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.options_frame.pack(pady=5)
+        
+        self.turbo_var = tk.BooleanVar(value=False)
+        self.turbo_check = tk.Checkbutton(
+            self.options_frame,
+            text="⚡ Turbo",
+            variable=self.turbo_var,
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"],
+            selectcolor=THEME_COLORS[self.casino_app.theme]["button"]
+        )
+        self.turbo_check.grid(row=0, column=0, padx=5)
+        
+        self.stop_on_win_var = tk.BooleanVar(value=False)
+        self.stop_on_win_check = tk.Checkbutton(
+            self.options_frame,
+            text="Parar al ganar",
+            variable=self.stop_on_win_var,
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"],
+            selectcolor=THEME_COLORS[self.casino_app.theme]["button"]
+        )
+        self.stop_on_win_check.grid(row=0, column=1, padx=5)
+        
+        self.auto_rounds_label = tk.Label(
+            self.options_frame,
+            text="Rondas auto: ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.auto_rounds_label.grid(row=1, column=0, padx=5)
+        
+        self.auto_rounds_var = tk.StringVar()
+        self.auto_rounds_var.set("10")
+        self.auto_rounds_entry = tk.Entry(
+            self.options_frame,
+            textvariable=self.auto_rounds_var,
+            font=("Arial", 12),
+            width=8
+        )
+        self.auto_rounds_entry.grid(row=1, column=1, padx=5)
+        
+        self.loss_limit_label = tk.Label(
+            self.options_frame,
+            text="Límite de pérdida ($): ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.loss_limit_label.grid(row=2, column=0, padx=5)
+        
+        self.loss_limit_var = tk.StringVar()  # vacio = sin limite
+        self.loss_limit_entry = tk.Entry(
+            self.options_frame,
+            textvariable=self.loss_limit_var,
+            font=("Arial", 12),
+            width=8
+        )
+        self.loss_limit_entry.grid(row=2, column=1, padx=5)
+        
+        self.play_frame = tk.Frame(
+            self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.play_frame.pack(pady=10)
 
         self.spin_button = tk.Button(
-            self.window,
+            self.play_frame,
             text="🎮 Girar",
             font=("Arial", 16, "bold"),
             bg=THEME_COLORS[self.casino_app.theme]["accent"],
             fg="#ffffff",
-            width=15,
+            width=12,
             height=2,
             command=self.spin
         )
-        self.spin_button.pack(pady=20)
+        self.spin_button.grid(row=0, column=0, padx=5)
+        
+        self.auto_button = tk.Button(
+            self.play_frame,
+            text="🔁 Auto",
+            font=("Arial", 16, "bold"),
+            bg=THEME_COLORS[self.casino_app.theme]["highlight"],
+            fg="#ffffff",
+            width=12,
+            height=2,
+            command=self.toggle_auto_play
+        )
+        self.auto_button.grid(row=0, column=1, padx=5)
         
 
         self.result_label = tk.Label(
@@ -146,51 +628,58 @@ class SlotMachine:
             font=("Arial", 12),
             bg=THEME_COLORS[self.casino_app.theme]["button"],
             fg=THEME_COLORS[self.casino_app.theme]["fg"],
-            command=self.window.destroy
+            command=self.hide
         )
         self.close_button.pack(pady=10)
     
+    def register_theme(self):
+        themes = self.casino_app.themes
+        for widget in (self.window, self.bet_frame, self.options_frame, self.play_frame):
+            themes.register(widget, bg="bg")
+        for widget in (self.title_label, self.balance_label, self.bet_label, self.auto_rounds_label, self.loss_limit_label):
+            themes.register(widget, bg="bg", fg="fg")
+        for widget in (self.turbo_check, self.stop_on_win_check):
+            themes.register(widget, bg="bg", fg="fg", selectcolor="button")
+        for widget in self.symbol_labels + [self.close_button]:
+            themes.register(widget, bg="button", fg="fg")
+        themes.register(self.symbols_frame, bg="bg", highlightbackground="highlight")
+        themes.register(self.spin_button, bg="accent")
+        themes.register(self.auto_button, bg="highlight")
+        themes.register(self.result_label, bg="bg", fg="accent")
+    
     def validate_bet(self, new_value):
         if new_value == "":
             return True
         
+        # se llama en cada tecla: un solo isdigit y una sola conversion
         if not new_value.isdigit():
             return False
         
-        if int(new_value) <= 0:
-            return False
-        
-        if int(new_value) > self.casino_app.balance:
-            return False
-            
-        return True
+        return 0 < int(new_value) <= self.casino_app.available_balance()
+    
+    def read_bet(self):
+        return read_bet(self.bet_var, self.casino_app.available_balance())
     
     def spin(self):
         if self.spinning:
             return
         
-        try:
-            bet = int(self.bet_var.get())
-            if bet <= 0:
-                messagebox.showerror("Error", "La apuesta debe ser mayor a cero.")
-                return
-            
-            if bet > self.casino_app.balance:
-                messagebox.showerror("Error", "No tienes suficiente saldo para esta apuesta.")
-                return
-        except ValueError:
-            messagebox.showerror("Error", "Por favor ingresa un número válido.")
+        bet = self.read_bet()
+        if bet is None or not self.casino_app.allow_bet(bet):
             return
         
         self.spinning = True
         self.result_label.config(text="")
         self.spin_button.config(state=tk.DISABLED)
-        self.animate_spin(bet)
+        
+        if self.turbo_var.get():
+            self.show_symbols(self.casino_app.draw_spin(bet))
+        else:
+            self.animate_spin(bet)
     
     def animate_spin(self, bet):
-        for after_id in self.after_ids:
-            self.window.after_cancel(after_id)
-        self.after_ids = []
+        clock = self.casino_app.clock
+        clock.cancel(self.window)
         
         self.symbols = []
         spin_duration = 2000
@@ -198,42 +687,390 @@ class SlotMachine:
         interval = spin_duration / animation_steps
         
         def update_symbols(step):
-            if step < animation_steps:
-                for i, label in enumerate(self.symbol_labels):
-                    random_symbol = random.choice(SYMBOLS)
-                    label.config(text=random_symbol)
-                
-                after_id = self.window.after(int(interval), lambda: update_symbols(step + 1))
-                self.after_ids.append(after_id)
-            else:
-                self.symbols = [random.choice(SYMBOLS) for _ in range(3)]
-                
-                for i, label in enumerate(self.symbol_labels):
-                    label.config(text=self.symbols[i])
-                
-                self.check_result(bet)
-        
-        update_symbols(0)
-    
-    def check_result(self, bet):
-        unique_symbols = set(self.symbols)
-        
-        if len(unique_symbols) == 1:
-            winnings = bet * 5
-            result_text = f"¡GANASTE! 🎉 Todos los símbolos coinciden.\nGanancia: ${winnings}"
-            self.casino_app.update_balance(winnings, is_win=True)
-        elif len(unique_symbols) == 2:
-            winnings = bet * 2
-            result_text = f"¡GANASTE! 🎉 Dos símbolos coinciden.\nGanancia: ${winnings}"
-            self.casino_app.update_balance(winnings, is_win=True)
-        else:
-            result_text = f"😢 No hay coincidencias.\nPérdida: ${bet}"
-            self.casino_app.update_balance(-bet, is_win=False)
+            for label in self.symbol_labels:
+                self.casino_app.show_symbol(label, random.choice(SYMBOLS))
+        
+        clock.repeat(self.window, interval, animation_steps, update_symbols, lambda: self.show_symbols(self.casino_app.draw_spin(bet)))
+    
+    def show_symbols(self, result):
+        self.symbols = result.symbols
+        
+        for i, label in enumerate(self.symbol_labels):
+            self.casino_app.show_symbol(label, self.symbols[i])
+        
+        self.check_result(result)
+    
+    def apply_result(self, result, refresh=True):
+        return apply_spin_result(self.casino_app, result, refresh)
+    
+    def check_result(self, result):
+        result_text = self.apply_result(result)
         
         self.result_label.config(text=result_text)
         self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
         self.spin_button.config(state=tk.NORMAL)
         self.spinning = False
+    
+    def toggle_auto_play(self):
+        if self.auto_play is not None:
+            self.auto_play.stop()
+            return
+        
+        if self.spinning:
+            return
+        
+        bet = self.read_bet()
+        settings = read_auto_settings(self.auto_rounds_var, self.loss_limit_var)
+        if bet is None or settings is None or not self.casino_app.allow_bet(bet):
+            return
+        
+        rounds, loss_limit = settings
+        self.spinning = True
+        self.spin_button.config(state=tk.DISABLED)
+        self.auto_button.config(text="⏹ Detener")
+        self.auto_play = AutoPlay(
+            self.window,
+            self.casino_app,
+            lambda: self.play_auto_round(bet),
+            self.render_auto_round,
+            self.finish_auto_play,
+            rounds,
+            stop_on_win=self.stop_on_win_var.get(),
+            loss_limit=loss_limit
+        )
+        self.auto_play.start()
+    
+    def play_auto_round(self, bet):
+        if bet > self.casino_app.available_balance():
+            return None
+        if not self.casino_app.allow_bet(bet):
+            return None
+        
+        result = self.casino_app.draw_spin(bet)
+        self.last_result_text = self.apply_result(result, refresh=False)
+        return result
+    
+    def render_auto_round(self, result):
+        self.symbols = result.symbols
+        for i, label in enumerate(self.symbol_labels):
+            self.casino_app.show_symbol(label, self.symbols[i])
+        
+        self.result_label.config(text=f"{self.last_result_text}\nRonda auto #{self.auto_play.played}")
+        self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+    
+    def finish_auto_play(self):
+        self.auto_play = None
+        self.auto_button.config(text="🔁 Auto")
+        self.spin_button.config(state=tk.NORMAL)
+        self.spinning = False
+
+class SlotCell:
+    def __init__(self, frame, symbol_labels, result_label, spin_button):
+        self.frame = frame
+        self.symbol_labels = symbol_labels
+        self.result_label = result_label
+        self.spin_button = spin_button
+
+class MultiSlotView:
+    MACHINE_COUNTS = (4, 9, 16, 25, 36, 49, 64)
+    SPIN_STEPS = 20
+    STEP_MS = 100
+    
+    def __init__(self, parent, casino_app, machines=16):
+        self.parent = parent
+        self.casino_app = casino_app
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("🎰 Multi-máquina")
+        self.window.geometry("1000x900")
+        self.window.config(bg=THEME_COLORS[casino_app.theme]["bg"])
+        
+        self.window.transient(parent)
+        self.window.grab_set()
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        
+        self.cells = []
+        self.spinning = {}  # celda -> [apuesta reservada, pasos de animacion restantes]
+        self.task = None
+        
+        self.create_widgets()
+        self.register_theme()
+        self.build_grid(machines)
+    
+    def create_widgets(self):
+        self.title_label = tk.Label(
+            self.window,
+            text="🎰 Multi-máquina 🎰",
+            font=("Arial", 20, "bold"),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.title_label.pack(pady=10)
+        
+        self.balance_label = tk.Label(
+            self.window,
+            text=f"💰 Saldo: ${self.casino_app.balance}",
+            font=("Arial", 14),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.balance_label.pack(pady=5)
+        
+        self.controls_frame = tk.Frame(
+            self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.controls_frame.pack(pady=5)
+        
+        self.bet_label = tk.Label(
+            self.controls_frame,
+            text="Apuesta por máquina ($): ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.bet_label.grid(row=0, column=0, padx=5)
+        
+        self.bet_var = tk.StringVar()
+        self.bet_var.set("10")
+        self.bet_entry = tk.Entry(
+            self.controls_frame,
+            textvariable=self.bet_var,
+            font=("Arial", 12),
+            width=8
+        )
+        self.bet_entry.grid(row=0, column=1, padx=5)
+        
+        self.machines_label = tk.Label(
+            self.controls_frame,
+            text="Máquinas: ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.machines_label.grid(row=0, column=2, padx=5)
+        
+        self.machines_var = tk.StringVar()
+        self.machines_menu = tk.OptionMenu(
+            self.controls_frame,
+            self.machines_var,
+            *[str(count) for count in self.MACHINE_COUNTS],
+            command=self.change_machines
+        )
+        self.machines_menu.config(
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["button"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.machines_menu.grid(row=0, column=3, padx=5)
+        
+        self.spin_all_button = tk.Button(
+            self.controls_frame,
+            text="🎮 Girar todas",
+            font=("Arial", 12, "bold"),
+            bg=THEME_COLORS[self.casino_app.theme]["accent"],
+            fg="#ffffff",
+            command=self.spin_all
+        )
+        self.spin_all_button.grid(row=0, column=4, padx=10)
+        
+        self.status_label = tk.Label(
+            self.window,
+            text="",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.status_label.pack(pady=5)
+        
+        self.grid_frame = tk.Frame(
+            self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.grid_frame.pack(pady=10)
+        
+        self.close_button = tk.Button(
+            self.window,
+            text="🚪 Cerrar",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["button"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"],
+            command=self.hide
+        )
+        self.close_button.pack(pady=10)
+    
+    def register_theme(self):
+        themes = self.casino_app.themes
+        for widget in (self.window, self.controls_frame, self.grid_frame):
+            themes.register(widget, bg="bg")
+        for widget in (self.title_label, self.balance_label, self.bet_label, self.machines_label, self.status_label):
+            themes.register(widget, bg="bg", fg="fg")
+        for widget in (self.machines_menu, self.close_button):
+            themes.register(widget, bg="button", fg="fg")
+        themes.register(self.spin_all_button, bg="accent")
+    
+    def build_grid(self, machines):
+        themes = self.casino_app.themes
+        for cell in self.cells:
+            for widget in [cell.frame, cell.result_label, cell.spin_button] + cell.symbol_labels:
+                themes.unregister(widget)
+            cell.frame.destroy()
+        
+        self.machines_var.set(str(machines))
+        columns = math.ceil(math.sqrt(machines))
+        font_size = 20 if columns <= 4 else 14 if columns <= 6 else 10
+        self.cells = []
+        for index in range(machines):
+            frame = tk.Frame(
+                self.grid_frame,
+                bg=THEME_COLORS[self.casino_app.theme]["bg"],
+                highlightbackground=THEME_COLORS[self.casino_app.theme]["highlight"],
+                highlightthickness=1,
+                padx=4,
+                pady=4
+            )
+            frame.grid(row=index // columns, column=index % columns, padx=3, pady=3)
+            
+            symbol_labels = []
+            for i in range(SLOT_REELS):
+                label = tk.Label(
+                    frame,
+                    text="❓",
+                    font=("Arial", font_size),
+                    width=2,
+                    bg=THEME_COLORS[self.casino_app.theme]["button"],
+                    fg=THEME_COLORS[self.casino_app.theme]["fg"]
+                )
+                label.grid(row=0, column=i, padx=1)
+                self.casino_app.glyphs.bind(label)
+                symbol_labels.append(label)
+            
+            result_label = tk.Label(
+                frame,
+                text="",
+                font=("Arial", 9, "bold"),
+                bg=THEME_COLORS[self.casino_app.theme]["bg"],
+                fg=THEME_COLORS[self.casino_app.theme]["accent"]
+            )
+            result_label.grid(row=1, column=0, columnspan=SLOT_REELS)
+            
+            cell = SlotCell(frame, symbol_labels, result_label, None)
+            cell.spin_button = tk.Button(
+                frame,
+                text="Girar",
+                font=("Arial", 9),
+                bg=THEME_COLORS[self.casino_app.theme]["button"],
+                fg=THEME_COLORS[self.casino_app.theme]["fg"],
+                command=lambda cell=cell: self.spin_one(cell)
+            )
+            cell.spin_button.grid(row=2, column=0, columnspan=SLOT_REELS)
+            self.cells.append(cell)
+            
+            themes.register(frame, bg="bg", highlightbackground="highlight")
+            themes.register(result_label, bg="bg", fg="accent")
+            themes.register(cell.spin_button, bg="button", fg="fg")
+            for label in symbol_labels:
+                themes.register(label, bg="button", fg="fg")
+        
+        self.refresh()
+    
+    def change_machines(self, value):
+        if self.spinning:
+            messagebox.showerror("Error", "Espera a que terminen los giros para cambiar el número de máquinas.")
+            self.machines_var.set(str(len(self.cells)))
+            return
+        self.build_grid(int(value))
+    
+    def spin_one(self, cell):
+        if cell in self.spinning:
+            return
+        bet = read_bet(self.bet_var, self.casino_app.available_balance())
+        if bet is not None and self.casino_app.allow_bet(bet):
+            self.start(cell, bet)
+            self.refresh()
+    
+    def spin_all(self):
+        bet = read_bet(self.bet_var, self.casino_app.available_balance())
+        if bet is None:
+            return
+        started = 0
+        for cell in self.cells:
+            # cada giro reserva su apuesta; se arrancan los que alcance el saldo disponible
+            if cell not in self.spinning and bet <= self.casino_app.available_balance():
+                # el aviso de limite se muestra una vez, no una por maquina
+                if not self.casino_app.allow_bet(bet, quiet=started > 0):
+                    break
+                self.start(cell, bet)
+                started += 1
+        self.refresh()
+    
+    def start(self, cell, bet):
+        self.casino_app.reserve(bet)
+        self.spinning[cell] = [bet, self.SPIN_STEPS]
+        cell.spin_button.config(state=tk.DISABLED)
+        self.casino_app.clock.set(cell.result_label, text="")
+        if self.task is None:
+            self.task = self.casino_app.clock.schedule(self.window, self.STEP_MS, self.step)
+    
+    def step(self):
+        # un solo paso de animacion para todas las maquinas que estan girando
+        self.task = None
+        clock = self.casino_app.clock
+        finished = []
+        for cell, state in self.spinning.items():
+            state[1] -= 1
+            if state[1] <= 0:
+                finished.append(cell)
+            else:
+                for label in cell.symbol_labels:
+                    self.casino_app.show_symbol(label, random.choice(SYMBOLS))
+        
+        for cell in finished:
+            self.resolve(cell)
+        if finished:
+            self.casino_app.refresh_labels()
+        self.refresh()
+        
+        if self.spinning:
+            self.task = clock.schedule(self.window, self.STEP_MS, self.step)
+    
+    def resolve(self, cell):
+        # se libera la reserva y se liquida en el mismo paso, sin otro giro en medio
+        bet = self.spinning.pop(cell)[0]
+        self.casino_app.release(bet)
+        result = self.casino_app.draw_spin(bet)
+        apply_spin_result(self.casino_app, result, refresh=False)
+        
+        clock = self.casino_app.clock
+        for label, symbol in zip(cell.symbol_labels, result.symbols):
+            self.casino_app.show_symbol(label, symbol)
+        text = f"+${result.winnings}" if result.winnings else f"-${result.lost}"
+        clock.set(cell.result_label, text=text)
+        clock.set(cell.spin_button, state=tk.NORMAL)
+    
+    def refresh(self):
+        self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+        self.status_label.config(text=f"Girando: {len(self.spinning)} · Reservado: ${self.casino_app.reserved}")
+    
+    def show(self):
+        self.refresh()
+        self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+    
+    def hide(self):
+        # los giros se sortean al terminar, asi que cortarlos solo devuelve lo reservado
+        self.casino_app.clock.cancel(self.window)
+        self.task = None
+        for cell, (bet, steps) in self.spinning.items():
+            self.casino_app.release(bet)
+            for label in cell.symbol_labels:
+                self.casino_app.show_symbol(label, "❓")
+            cell.spin_button.config(state=tk.NORMAL)
+        self.spinning = {}
+        self.refresh()
+        self.window.grab_release()
+        self.window.withdraw()
 
 class ScratchCard:
     def __init__(self, parent, casino_app):
@@ -242,7 +1079,7 @@ class ScratchCard:
         
         self.window = tk.Toplevel(parent)
         self.window.title("🎟️ Rasca y Gana")
-        self.window.geometry("800x800")
+        self.window.geometry("800x900")
         self.window.resizable(False, False)
         self.window.config(bg=THEME_COLORS[casino_app.theme]["bg"])
         
@@ -252,9 +1089,32 @@ class ScratchCard:
         self.scratched = False
         self.symbols = []
         self.card_buttons = []
-        self.bet_amount = 20  # cuanto cuestan los rasca y gana
+        self.bet_amount = SCRATCH_PRICE
+        self.result = None
+        self.result_pending = False
+        self.auto_play = None
         
         self.create_widgets()
+        self.register_theme()
+        self.window.protocol("WM_DELETE_WINDOW", self.hide)
+        self.window.bind("<Destroy>", self.on_destroy, add="+")
+    
+    def show(self):
+        self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+        self.window.deiconify()
+        self.window.lift()
+        self.window.grab_set()
+    
+    def hide(self):
+        if self.auto_play is not None:
+            self.auto_play.stop()
+        # una tarjeta ya comprada se cobra aunque se cierre la ventana a medio rascar
+        self.casino_app.clock.cancel(self.window)
+        if self.result_pending:
+            self.reveal_all()
+            self.check_result()
+        self.window.grab_release()
+        self.window.withdraw()
     
     def create_widgets(self):
         self.title_label = tk.Label(
@@ -277,7 +1137,7 @@ class ScratchCard:
         
         self.instructions_label = tk.Label(
             self.window,
-            text=f"Costo por tarjeta: ${self.bet_amount}\nHaz clic en 'Rascar' para revelar los símbolos.\nNecesitas 3 o más símbolos iguales para ganar.",
+            text=f"Costo por tarjeta: ${self.bet_amount}\nHaz clic en 'Rascar' para revelar los símbolos.\nNecesitas {SCRATCH_TABLE.min_win} o más símbolos iguales para ganar.",
             font=("Arial", 12),
             bg=THEME_COLORS[self.casino_app.theme]["bg"],
             fg=THEME_COLORS[self.casino_app.theme]["fg"],
@@ -296,9 +1156,9 @@ class ScratchCard:
         self.grid_frame.pack(pady=20)
         
         self.card_buttons = []
-        for i in range(3):
+        for i in range(SCRATCH_ROWS):
             row = []
-            for j in range(3):
+            for j in range(SCRATCH_COLS):
                 button = tk.Button(
                     self.grid_frame,
                     text="❓",
@@ -310,20 +1170,106 @@ class ScratchCard:
                     state=tk.DISABLED
                 )
                 button.grid(row=i, column=j, padx=5, pady=5)
+                self.casino_app.glyphs.bind(button)
                 row.append(button)
             self.card_buttons.append(row)
         
-        self.scratch_button = tk.Button(
+        self.options_frame = tk.Frame(
             self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.options_frame.pack(pady=5)
+        
+        self.turbo_var = tk.BooleanVar(value=False)
+        self.turbo_check = tk.Checkbutton(
+            self.options_frame,
+            text="⚡ Turbo",
+            variable=self.turbo_var,
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"],
+            selectcolor=THEME_COLORS[self.casino_app.theme]["button"]
+        )
+        self.turbo_check.grid(row=0, column=0, padx=5)
+        
+        self.stop_on_win_var = tk.BooleanVar(value=False)
+        self.stop_on_win_check = tk.Checkbutton(
+            self.options_frame,
+            text="Parar al ganar",
+            variable=self.stop_on_win_var,
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"],
+            selectcolor=THEME_COLORS[self.casino_app.theme]["button"]
+        )
+        self.stop_on_win_check.grid(row=0, column=1, padx=5)
+        
+        self.auto_rounds_label = tk.Label(
+            self.options_frame,
+            text="Tarjetas auto: ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.auto_rounds_label.grid(row=0, column=2, padx=5)
+        
+        self.auto_rounds_var = tk.StringVar()
+        self.auto_rounds_var.set("10")
+        self.auto_rounds_entry = tk.Entry(
+            self.options_frame,
+            textvariable=self.auto_rounds_var,
+            font=("Arial", 12),
+            width=6
+        )
+        self.auto_rounds_entry.grid(row=0, column=3, padx=5)
+        
+        self.loss_limit_label = tk.Label(
+            self.options_frame,
+            text="Límite de pérdida ($): ",
+            font=("Arial", 12),
+            bg=THEME_COLORS[self.casino_app.theme]["bg"],
+            fg=THEME_COLORS[self.casino_app.theme]["fg"]
+        )
+        self.loss_limit_label.grid(row=0, column=4, padx=5)
+        
+        self.loss_limit_var = tk.StringVar()  # vacio = sin limite
+        self.loss_limit_entry = tk.Entry(
+            self.options_frame,
+            textvariable=self.loss_limit_var,
+            font=("Arial", 12),
+            width=6
+        )
+        self.loss_limit_entry.grid(row=0, column=5, padx=5)
+        
+        self.play_frame = tk.Frame(
+            self.window,
+            bg=THEME_COLORS[self.casino_app.theme]["bg"]
+        )
+        self.play_frame.pack(pady=10)
+        
+        self.scratch_button = tk.Button(
+            self.play_frame,
             text="🪙 Rascar",
             font=("Arial", 16, "bold"),
             bg=THEME_COLORS[self.casino_app.theme]["highlight"],
             fg="#ffffff",
-            width=15,
+            width=12,
             height=2,
             command=self.scratch_card
         )
-        self.scratch_button.pack(pady=20)
+        self.scratch_button.grid(row=0, column=0, padx=5)
+        
+        self.auto_button = tk.Button(
+            self.play_frame,
+            text="🔁 Auto",
+            font=("Arial", 16, "bold"),
+            bg=THEME_COLORS[self.casino_app.theme]["accent"],
+            fg="#ffffff",
+            width=12,
+            height=2,
+            command=self.toggle_auto_play
+        )
+        self.auto_button.grid(row=0, column=1, padx=5)
         
         self.result_label = tk.Label(
             self.window,
@@ -357,117 +1303,281 @@ class ScratchCard:
             font=("Arial", 12),
             bg=THEME_COLORS[self.casino_app.theme]["button"],
             fg=THEME_COLORS[self.casino_app.theme]["fg"],
-            command=self.window.destroy
+            command=self.hide
         )
         self.close_button.grid(row=0, column=1, padx=5)
     
+    def register_theme(self):
+        themes = self.casino_app.themes
+        for widget in (self.window, self.options_frame, self.play_frame, self.buttons_frame):
+            themes.register(widget, bg="bg")
+        for widget in (self.title_label, self.balance_label, self.instructions_label, self.auto_rounds_label, self.loss_limit_label):
+            themes.register(widget, bg="bg", fg="fg")
+        for widget in (self.turbo_check, self.stop_on_win_check):
+            themes.register(widget, bg="bg", fg="fg", selectcolor="button")
+        for widget in (self.new_card_button, self.close_button):
+            themes.register(widget, bg="button", fg="fg")
+        for row in self.card_buttons:
+            for button in row:
+                themes.register(button, bg="accent")
+        themes.register(self.grid_frame, bg="bg", highlightbackground="highlight")
+        themes.register(self.scratch_button, bg="highlight")
+        themes.register(self.auto_button, bg="accent")
+        themes.register(self.result_label, bg="bg", fg="accent")
+    
     def scratch_card(self):
-        if self.scratched:
+        if self.scratched or self.auto_play is not None:
             return
         
-        if self.casino_app.balance < self.bet_amount:
+        if self.casino_app.available_balance() < self.bet_amount:
             messagebox.showerror("Error", "No tienes suficiente saldo para comprar una tarjeta.")
             return
+        if not self.casino_app.allow_bet(self.bet_amount):
+            return
         
-        self.symbols = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                symbol = random.choice(SYMBOLS)
-                row.append(symbol)
-            self.symbols.append(row)
-        
-        self.animate_scratch()
+        self.result = self.casino_app.draw_scratch(self.bet_amount)
+        if self.result is None:
+            return
+        self.symbols = self.result.symbols
+        self.result_pending = True
         self.scratched = True
         self.scratch_button.config(state=tk.DISABLED)
-        self.new_card_button.config(state=tk.NORMAL)
+        # el auto no puede arrancar hasta que se cobre la tarjeta comprada
+        self.auto_button.config(state=tk.DISABLED)
+        
+        if self.turbo_var.get():
+            self.reveal_all()
+            self.check_result()
+        else:
+            self.animate_scratch()
     
     def animate_scratch(self):
         positions = []
-        for i in range(3):
-            for j in range(3):
+        for i in range(SCRATCH_ROWS):
+            for j in range(SCRATCH_COLS):
                 positions.append((i, j))
         
         random.shuffle(positions)
         delay = 300
+        clock = self.casino_app.clock
         
         for idx, (i, j) in enumerate(positions):
-            self.window.after(
+            clock.schedule(
+                self.window,
                 idx * delay,
                 lambda row=i, col=j: self.reveal_symbol(row, col)
             )
         
-        self.window.after(
+        clock.schedule(
+            self.window,
             len(positions) * delay + 100,
             self.check_result
         )
     
     def reveal_symbol(self, row, col):
         symbol = self.symbols[row][col]
-        self.card_buttons[row][col].config(
-            text=symbol,
+        button = self.card_buttons[row][col]
+        self.casino_app.show_symbol(
+            button,
+            symbol,
             bg=THEME_COLORS[self.casino_app.theme]["button"],
             fg=THEME_COLORS[self.casino_app.theme]["fg"]
         )
+        self.casino_app.themes.register(button, bg="button", fg="fg")
     
-    def check_result(self):
-        self.casino_app.update_balance(-self.bet_amount, is_win=False)
-        
-        symbol_count = {}
-        for row in self.symbols:
-            for symbol in row:
-                symbol_count[symbol] = symbol_count.get(symbol, 0) + 1
+    def reveal_all(self):
+        for i in range(SCRATCH_ROWS):
+            for j in range(SCRATCH_COLS):
+                self.reveal_symbol(i, j)
+    
+    def apply_result(self, result, refresh=True):
+        self.casino_app.update_balance(-result.lost, is_win=False, game="scratch", bet=result.bet, refresh=refresh)
         
-        max_count = max(symbol_count.values())
+        max_count = result.max_count
+        winnings = result.winnings
         
-        if max_count >= 3:
-            if max_count == 9:
-                winnings = self.bet_amount * 100
+        if winnings:
+            if max_count == SCRATCH_TABLE.cells:
                 result_text = f"🎰 ¡JACKPOT! 🎰\nTodos los símbolos coinciden.\nGanancia: ${winnings}"
             elif max_count >= 5:
-                winnings = self.bet_amount * 10
                 result_text = f"🤑 ¡Excelente! {max_count} símbolos coinciden.\nGanancia: ${winnings}"
             elif max_count == 4:
-                winnings = self.bet_amount * 5
                 result_text = f"😊 ¡Bien! {max_count} símbolos coinciden.\nGanancia: ${winnings}"
             else:
-                winnings = self.bet_amount * 2
                 result_text = f"🙂 ¡Ganaste! {max_count} símbolos coinciden.\nGanancia: ${winnings}"
             
-            self.casino_app.update_balance(winnings, is_win=True)
+            self.casino_app.update_balance(winnings, is_win=True, game="scratch", bet=result.bet, refresh=refresh)
             
         else:
-            result_text = f"😢 No hay suficientes símbolos iguales.\nPérdida: ${self.bet_amount}"
+            result_text = f"😢 No hay suficientes símbolos iguales.\nPérdida: ${result.bet}"
+        
+        self.casino_app.record_round("scratch", result)
+        if triggers_jackpot("scratch", result):
+            amount = self.casino_app.award_jackpot(refresh=refresh)
+            result_text += f"\n💰 Jackpot progresivo: ${amount}"
+        return result_text
+    
+    def check_result(self):
+        if not self.result_pending:
+            return
+        self.result_pending = False
+        result_text = self.apply_result(self.result)
         
         self.result_label.config(text=result_text)
         self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+        self.new_card_button.config(state=tk.NORMAL)
+        self.auto_button.config(state=tk.NORMAL)
+    
+    def on_destroy(self, event):
+        # una tarjeta ya comprada se cobra aunque se cierre la ventana a medio rascar
+        if event.widget is self.window and self.result_pending:
+            self.result_pending = False
+            self.apply_result(self.result)
+    
+    def toggle_auto_play(self):
+        if self.auto_play is not None:
+            self.auto_play.stop()
+            return
+        
+        if self.result_pending:
+            return
+        
+        if self.scratched:
+            self.new_card()
+        
+        settings = read_auto_settings(self.auto_rounds_var, self.loss_limit_var)
+        if settings is None:
+            return
+        
+        if self.casino_app.available_balance() < self.bet_amount:
+            messagebox.showerror("Error", "No tienes suficiente saldo para comprar una tarjeta.")
+            return
+        if not self.casino_app.allow_bet(self.bet_amount):
+            return
+        
+        rounds, loss_limit = settings
+        self.scratch_button.config(state=tk.DISABLED)
+        self.auto_button.config(text="⏹ Detener")
+        self.auto_play = AutoPlay(
+            self.window,
+            self.casino_app,
+            self.play_auto_round,
+            self.render_auto_round,
+            self.finish_auto_play,
+            rounds,
+            stop_on_win=self.stop_on_win_var.get(),
+            loss_limit=loss_limit
+        )
+        self.auto_play.start()
+    
+    def play_auto_round(self):
+        if self.casino_app.available_balance() < self.bet_amount:
+            return None
+        if not self.casino_app.allow_bet(self.bet_amount):
+            return None
+        
+        self.result = self.casino_app.draw_scratch(self.bet_amount)
+        if self.result is None:
+            return None
+        self.last_result_text = self.apply_result(self.result, refresh=False)
+        return self.result
+    
+    def render_auto_round(self, result):
+        self.symbols = result.symbols
+        self.reveal_all()
+        self.result_label.config(text=f"{self.last_result_text}\nTarjeta auto #{self.auto_play.played}")
+        self.balance_label.config(text=f"💰 Saldo: ${self.casino_app.balance}")
+    
+    def finish_auto_play(self):
+        played = self.auto_play.played
+        self.auto_play = None
+        self.auto_button.config(text="🔁 Auto")
+        if played:
+            self.scratched = True
+            self.new_card_button.config(state=tk.NORMAL)
+        else:
+            self.scratch_button.config(state=tk.NORMAL)
     
     def new_card(self):
         self.scratched = False
         
-        for i in range(3):
-            for j in range(3):
-                self.card_buttons[i][j].config(
-                    text="❓",
+        for i in range(SCRATCH_ROWS):
+            for j in range(SCRATCH_COLS):
+                self.casino_app.show_symbol(
+                    self.card_buttons[i][j],
+                    "❓",
                     bg=THEME_COLORS[self.casino_app.theme]["accent"],
                     fg="#ffffff",
                     state=tk.DISABLED
                 )
+                self.casino_app.themes.register(self.card_buttons[i][j], bg="accent")
         
         self.scratch_button.config(state=tk.NORMAL)
         self.new_card_button.config(state=tk.DISABLED)
         self.result_label.config(text="")
 
 class CasinoGame:
-    def __init__(self, root):
+    def __init__(self, root, fps=60, rng=None, report_startup=False, instrumentation=None, report_frames=False,
+                 ticket_pool=None, limits=None, accounts=None, player_id=None):
+        self.started = time.perf_counter()
+        self.startup_times = {}
+        self.report_startup = report_startup
+        self.report_frames = report_frames
+        
         self.root = root
-        self.root.title("🎰 Casino Virtual")
-        self.root.geometry("800x600")
-        self.root.resizable(False, False)
+        # se graban los valores crudos de cada ronda para poder volver a sortearla al auditar
+        self.rng = RecordingRNG(rng or SecureRNG())
+        self.streams = {}
+        self.ticket_pool = ticket_pool
+        # con una base de cuentas el saldo vive en ella; el JSON y el ledger quedan como registro local
+        self.accounts = accounts
+        self.player_id = player_id
+        self.clock = FrameClock(root, fps)
+        self.themes = ThemeRegistry()
+        self.glyphs = GlyphCache(root)
+        self.games = {}
         
         self.balance = INITIAL_MONEY
+        self.reserved = 0  # apuestas de giros en curso en la vista multi-maquina
+        self.total_won = 0
+        self.total_lost = 0
         self.theme = "light"
-        self.apply_theme()
+        self.history = RoundHistory(max(SLOT_REELS, SCRATCH_TABLE.cells))
+        self.limits = Limits()
+        
+        self.ledger = Ledger()
+        self.audit = AuditLog()
+        self.rounds_log = SessionLog()
+        self.jackpot = JackpotPool()
+        self.jackpot_worker = None
+        self.jackpot_value = None
+        self.instrumentation = instrumentation
+        self.metrics_path = None
+        if instrumentation is not None:
+            self.instrument()
+        self.saver = SaveScheduler(root, self.save_game_data)
+        self.closed = False
+        # el estado se lee antes de crear los widgets, que nacen ya con su saldo y su tema
+        self.load_game_data()
+        if limits:
+            # los limites pasados por linea de comandos reemplazan a los guardados
+            self.limits.configure(**limits)
+        self.mark_startup("state")
+        
+        self.create_widgets()
+        self.register_theme()
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_game)
+        self.mark_startup("widgets")
+        
+        self.audit.start_session(self.balance, type(self.rng.source).__name__)
+        self.flush_logs()
+        self.root.after_idle(self.finish_startup)
+    
+    def create_widgets(self):
+        self.root.title("🎰 Casino Virtual")
+        self.root.geometry("800x700")
+        self.root.resizable(False, False)
+        self.root.config(bg=THEME_COLORS[self.theme]["bg"])
         
         self.main_frame = tk.Frame(self.root, bg=THEME_COLORS[self.theme]["bg"])
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -499,7 +1609,7 @@ class CasinoGame:
         
         self.won_label = tk.Label(
             self.stats_frame,
-            text="🤑 Ganado: $0",
+            text=f"🤑 Ganado: ${self.total_won}",
             font=("Arial", 12),
             bg=THEME_COLORS[self.theme]["bg"],
             fg=THEME_COLORS[self.theme]["fg"]
@@ -508,12 +1618,36 @@ class CasinoGame:
         
         self.lost_label = tk.Label(
             self.stats_frame,
-            text="😭 Perdido: $0",
+            text=f"😭 Perdido: ${self.total_lost}",
             font=("Arial", 12),
             bg=THEME_COLORS[self.theme]["bg"],
             fg=THEME_COLORS[self.theme]["fg"]
         )
         self.lost_label.pack(side=tk.LEFT, padx=10)
+        
+        self.jackpot_label = tk.Label(
+            self.stats_frame,
+            text=f"🏆 Jackpot: ${self.jackpot.value()}",
+            font=("Arial", 12, "bold"),
+            bg=THEME_COLORS[self.theme]["bg"],
+            fg=THEME_COLORS[self.theme]["fg"]
+        )
+        self.jackpot_label.pack(side=tk.LEFT, padx=10)
+
+        self.history_frame = tk.Frame(self.main_frame, bg=THEME_COLORS[self.theme]["bg"])
+        self.history_frame.pack(pady=5)
+        
+        self.game_stats_labels = {}
+        for game in GAMES:
+            label = tk.Label(
+                self.history_frame,
+                text=self.format_game_stats(game),
+                font=("Arial", 11),
+                bg=THEME_COLORS[self.theme]["bg"],
+                fg=THEME_COLORS[self.theme]["fg"]
+            )
+            label.pack()
+            self.game_stats_labels[game] = label
 
         self.button_frame = tk.Frame(self.main_frame, bg=THEME_COLORS[self.theme]["bg"])
         self.button_frame.pack(pady=20)
@@ -567,6 +1701,18 @@ class CasinoGame:
         )
         self.exit_button.grid(row=1, column=1, padx=10, pady=10)
         
+        self.multi_button = tk.Button(
+            self.button_frame,
+            text="🎰 Multi-máquina",
+            font=("Arial", 14),
+            bg=THEME_COLORS[self.theme]["button"],
+            fg=THEME_COLORS[self.theme]["fg"],
+            width=20,
+            height=2,
+            command=self.open_multi_slot
+        )
+        self.multi_button.grid(row=2, column=0, columnspan=2, padx=10, pady=10)
+        
         # Theme toggle button
         self.theme_button = tk.Button(
             self.main_frame,
@@ -577,93 +1723,316 @@ class CasinoGame:
             command=self.toggle_theme
         )
         self.theme_button.pack(pady=10)
-        
-
-        self.total_won = 0
-        self.total_lost = 0
-        
-        self.load_game_data()
+    
+    def instrument(self):
+        # los ganchos solo existen con la instrumentacion activada; sin ella no hay ningun costo
+        metrics = self.instrumentation
+        metrics.wrap(SlotMachine, "validate_bet", "bet.validate")
+        metrics.wrap(SlotMachine, "read_bet", "bet.read")
+        metrics.wrap(self.rng, "indices", "rng.draw", counter="draws")
+        metrics.wrap(engine, "spin_from_indices", "round.evaluate")
+        metrics.wrap(engine, "card_from_indices", "round.evaluate")
+        metrics.wrap(self, "update_balance", "balance.update", counter="balance_updates")
+        metrics.wrap(self, "record_round", "round.record", after=metrics.round_done)
+        metrics.wrap(self, "refresh_labels", "labels.refresh", counter="label_updates")
+        metrics.wrap(self.clock, "tick", "frame.tick", counter="frames")
+        metrics.wrap(self, "save_game_data", "state.save", counter="saves")
+        metrics.wrap(self.ledger, "flush", "ledger.flush")
+        metrics.wrap(self.audit, "flush", "audit.flush")
+        self.clock.render_observer = lambda elapsed: metrics.observe("frame.render", int(elapsed * 1e9))
+    
+    def mark_startup(self, phase):
+        self.startup_times[phase] = (time.perf_counter() - self.started) * 1000
+    
+    def finish_startup(self):
+        # after_idle corre cuando Tk ya dibujo la ventana y atiende eventos
+        self.mark_startup("interactive")
+        if self.report_startup:
+            print(f"imports: {(self.started - IMPORT_STARTED) * 1000:.1f} ms")
+            for phase, elapsed in self.startup_times.items():
+                print(f"{phase}: {elapsed:.1f} ms")
+    
+    def register_theme(self):
+        for widget in (self.root, self.main_frame, self.balance_frame, self.stats_frame, self.history_frame, self.button_frame):
+            self.themes.register(widget, bg="bg")
+        for widget in (self.title_label, self.balance_label, self.won_label, self.lost_label, self.jackpot_label,
+                       *self.game_stats_labels.values()):
+            self.themes.register(widget, bg="bg", fg="fg")
+        for button in (self.slot_button, self.scratch_button, self.balance_button, self.exit_button, self.multi_button, self.theme_button):
+            self.themes.register(button, bg="button", fg="fg")
     
     def apply_theme(self):
-        self.root.config(bg=THEME_COLORS[self.theme]["bg"])
+        # una sola pasada por los widgets registrados de todas las ventanas abiertas
+        self.themes.apply(self.theme)
+        self.theme_button.config(
+            text="🌙 Cambiar a Tema Oscuro" if self.theme == "light" else "☀️ Cambiar a Tema Claro"
+        )
     
     def toggle_theme(self):
         self.theme = "dark" if self.theme == "light" else "light"
         self.apply_theme()
-        self.theme_button.config(
-            text="🌙 Cambiar a Tema Oscuro" if self.theme == "light" else "☀️ Cambiar a Tema Claro",
-            bg=THEME_COLORS[self.theme]["button"],
-            fg=THEME_COLORS[self.theme]["fg"]
-        )
-        
-        self.main_frame.config(bg=THEME_COLORS[self.theme]["bg"])
-        self.title_label.config(bg=THEME_COLORS[self.theme]["bg"], fg=THEME_COLORS[self.theme]["fg"])
-        self.balance_frame.config(bg=THEME_COLORS[self.theme]["bg"])
-        self.balance_label.config(bg=THEME_COLORS[self.theme]["bg"], fg=THEME_COLORS[self.theme]["fg"])
-        self.stats_frame.config(bg=THEME_COLORS[self.theme]["bg"])
-        self.won_label.config(bg=THEME_COLORS[self.theme]["bg"], fg=THEME_COLORS[self.theme]["fg"])
-        self.lost_label.config(bg=THEME_COLORS[self.theme]["bg"], fg=THEME_COLORS[self.theme]["fg"])
-        self.button_frame.config(bg=THEME_COLORS[self.theme]["bg"])
-        
-        for button in [self.slot_button, self.scratch_button, self.balance_button, self.exit_button]:
-            button.config(bg=THEME_COLORS[self.theme]["button"], fg=THEME_COLORS[self.theme]["fg"])
+        self.saver.request()
+    
+    def open_game(self, game_class):
+        # cada juego se construye la primera vez y despues solo se oculta y se vuelve a mostrar
+        game = self.games.get(game_class)
+        if game is not None and game.window.winfo_exists():
+            game.show()
+        else:
+            self.games[game_class] = game_class(self.root, self)
     
     def open_slot_machine(self):
-        SlotMachine(self.root, self)
+        self.open_game(SlotMachine)
+    
+    def open_multi_slot(self):
+        self.open_game(MultiSlotView)
         
     def open_scratch_card(self):
-        ScratchCard(self.root, self)
+        self.open_game(ScratchCard)
     
     def show_balance(self):
         messagebox.showinfo("💰 Saldo Actual", f"Tu saldo actual es: ${self.balance}\n\nHas ganado: ${self.total_won}\nHas perdido: ${self.total_lost}")
     
-    def exit_game(self):
+    def shutdown(self):
+        # comun a todas las salidas; se puede llamar mas de una vez
+        if self.closed:
+            return
+        self.closed = True
+        for game in self.games.values():
+            if game.window.winfo_exists():
+                game.hide()
+        self.saver.cancel()
+        self.root.after_cancel(self.flush_task)
         self.save_game_data()
+        self.ledger.close()
+        self.audit.close()
+        self.rounds_log.close()
+        if self.jackpot_worker is not None:
+            self.jackpot_worker.join()
+        self.jackpot.close()
+        if self.instrumentation is not None:
+            self.instrumentation.close(self.metrics_path)
+        if self.ticket_pool is not None:
+            self.ticket_pool.close()
+        if self.accounts is not None:
+            self.accounts.close()
+        stats = self.clock.render_stats()
+        if self.report_frames and stats is not None:
+            print(f"render: {stats['frames']} frames, mean {stats['mean_ms']:.2f} ms, "
+                  f"p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms "
+                  f"(glyph cache {'on' if self.glyphs.enabled else 'off'})")
+    
+    def exit_game(self):
+        self.shutdown()
         self.root.destroy()
     
-    def update_balance(self, amount, is_win=True):
-        self.balance += amount
-        if is_win and amount > 0:
-            self.total_won += amount
-        elif not is_win and amount < 0:
-            self.total_lost += abs(amount)
+    def update_balance(self, amount, is_win=True, game=None, bet=None, refresh=True):
+        if self.accounts is not None:
+            # la base aplica el movimiento en una transaccion y devuelve el saldo de todas las ventanas
+            if amount > 0:
+                self.sync_account(self.accounts.credit(self.player_id, amount))
+            elif amount < 0:
+                self.sync_account(self.accounts.debit(self.player_id, -amount))
+        else:
+            self.balance += amount
+            if is_win and amount > 0:
+                self.total_won += amount
+            elif not is_win and amount < 0:
+                self.total_lost += abs(amount)
+        
+        self.ledger.append(game, bet, amount, is_win, self.balance)
+        self.saver.request()
         
+        if refresh:
+            self.refresh_labels()
+    
+    def keep_stream(self, result):
+        # el resultado queda referenciado hasta que se graba, asi su id no se reutiliza
+        self.streams[id(result)] = (result, self.rng.take())
+        return result
+    
+    def draw_spin(self, bet):
+        return self.keep_stream(spin(bet, self.rng))
+    
+    def draw_scratch(self, bet):
+        # con una tirada cargada las tarjetas salen de ella, en orden; si no, se sortean
+        if self.ticket_pool is None:
+            return self.keep_stream(draw_card(self.rng, bet))
+        if self.ticket_pool.remaining() <= 0:
+            messagebox.showerror("Error", "Se agotaron las tarjetas de esta tirada.")
+            return None
+        return card_from_indices(self.ticket_pool.deal(), bet)
+    
+    def show_symbol(self, widget, symbol, **options):
+        # la celda cambia a la imagen cacheada del simbolo, o a texto si no hay glifos
+        options.update(self.glyphs.options(widget, symbol))
+        self.clock.set(widget, **options)
+    
+    def allow_bet(self, bet, quiet=False):
+        if self.accounts is not None:
+            # otra ventana del mismo jugador pudo gastar el saldo desde la ultima ronda
+            self.sync_account(self.accounts.get(self.player_id))
+            if bet > self.available_balance():
+                if not quiet:
+                    messagebox.showerror("Error", "No tienes suficiente saldo para esta apuesta.")
+                return False
+        # limites de juego responsable; las apuestas reservadas cuentan como ya hechas
+        reason = self.limits.check(bet + self.reserved)
+        if reason is None:
+            return True
+        if not quiet:
+            messagebox.showerror("Límite de juego", reason)
+        return False
+    
+    def available_balance(self):
+        return self.balance - self.reserved
+    
+    def reserve(self, amount):
+        if amount > self.available_balance():
+            raise ValueError("Saldo insuficiente para reservar la apuesta")
+        self.reserved += amount
+    
+    def release(self, amount):
+        self.reserved -= amount
+    
+    def refresh_labels(self):
         self.balance_label.config(text=f"💰 Saldo: ${self.balance}")
         self.won_label.config(text=f"🤑 Ganado: ${self.total_won}")
         self.lost_label.config(text=f"😭 Perdido: ${self.total_lost}")
+        for game, label in self.game_stats_labels.items():
+            label.config(text=self.format_game_stats(game))
+    
+    def format_game_stats(self, game):
+        stats = self.history.stats[game]
+        name = GAME_NAMES[game]
+        if not stats.rounds:
+            return f"{name}: sin rondas"
+        streak = f"+{stats.streak}" if stats.streak > 0 else str(stats.streak)
+        return (f"{name}: {stats.rounds} rondas · RTP {stats.rtp():.1%} · Aciertos {stats.win_rate():.1%} · "
+                f"Racha {streak} (mejor +{stats.best_streak}, peor {stats.worst_streak})")
+    
+    def record_round(self, game, result):
+        # las tarjetas de una tirada cargada no pasan por el generador y no tienen flujo
+        kept = self.streams.pop(id(result), None)
+        self.audit.record(game, result, self.balance, kept[1] if kept else None)
+        self.rounds_log.record(game, result, self.balance)
+        self.history.add_result(game, result)
+        self.jackpot.contribute(result.bet)
+        self.limits.record(result.delta)
+    
+    def award_jackpot(self, refresh=True):
+        # la clave es la ronda auditada: si se pide dos veces, se paga una sola
+        key = f"{self.audit.session}:{self.audit.round}"
+        amount = self.jackpot.award(key)
+        self.update_balance(amount, is_win=True, game="jackpot", bet=0, refresh=refresh)
+        self.audit.record_jackpot(key, amount, self.balance)
+        self.jackpot_label.config(text=f"🏆 Jackpot: ${self.jackpot.value()}")
+        return amount
+    
+    def flush_logs(self):
+        self.ledger.flush()
+        self.audit.flush()
+        self.rounds_log.flush()
+        # el fsync del shard y la lectura del pozo van en otro hilo; Tk solo toca el
+        # widget, con el valor que dejo la vuelta anterior
+        if self.jackpot_value is not None:
+            self.jackpot_label.config(text=f"🏆 Jackpot: ${self.jackpot_value}")
+            self.jackpot_value = None
+        if self.jackpot_worker is None or not self.jackpot_worker.is_alive():
+            self.jackpot_worker = threading.Thread(target=self.refresh_jackpot, name="casino-jackpot", daemon=True)
+            self.jackpot_worker.start()
+        self.flush_task = self.root.after(int(self.ledger.flush_interval * 1000), self.flush_logs)
+    
+    def refresh_jackpot(self):
+        # los aportes de otras ventanas y procesos entran al leer los shards
+        self.jackpot.flush()
+        self.jackpot_value = self.jackpot.value()
     
     def save_game_data(self):
         data = {
             "balance": self.balance,
             "total_won": self.total_won,
             "total_lost": self.total_lost,
-            "theme": self.theme
+            "theme": self.theme,
+            "limits": self.limits.state()
         }
         
         try:
-            with open("casino_data.json", "w") as file:
-                json.dump(data, file)
+            save_state(data)
         except Exception as e:
             print(f"Error saving game data: {e}")
     
     def load_game_data(self):
         try:
-            if os.path.exists("casino_data.json"):
-                with open("casino_data.json", "r") as file:
-                    data = json.load(file)
-                    self.balance = data.get("balance", INITIAL_MONEY)
-                    self.total_won = data.get("total_won", 0)
-                    self.total_lost = data.get("total_lost", 0)
-                    self.theme = data.get("theme", "light")
-                    
-                    self.balance_label.config(text=f"💰 Saldo: ${self.balance}")
-                    self.won_label.config(text=f"🤑 Ganado: ${self.total_won}")
-                    self.lost_label.config(text=f"😭 Perdido: ${self.total_lost}")
-                    self.apply_theme()
+            data = load_state()
+            if data is not None:
+                self.balance = data.get("balance", INITIAL_MONEY)
+                self.total_won = data.get("total_won", 0)
+                self.total_lost = data.get("total_lost", 0)
+                self.theme = data.get("theme", "light")
+                if "limits" in data:
+                    self.limits.restore(data["limits"])
+            
+            # el ledger tiene cada ronda, asi que manda sobre el ultimo guardado
+            state = self.ledger.recover()
+            if state is not None:
+                self.balance = state["balance"]
+                self.total_won = state["total_won"]
+                self.total_lost = state["total_lost"]
+            
+            if self.accounts is not None:
+                self.sync_account(self.accounts.open_account(self.player_id))
         except Exception as e:
             print(f"Error loading game data: {e}")
+    
+    def sync_account(self, account):
+        self.balance = account["balance"]
+        self.total_won = account["total_won"]
+        self.total_lost = account["total_lost"]
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Casino Virtual.")
+    parser.add_argument("--startup-report", action="store_true", help="print startup timings")
+    parser.add_argument("--frame-report", action="store_true", help="print per-frame render times on exit")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_FILE, default=None,
+                        help="enable instrumentation and export it to this file (.prom for Prometheus text)")
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="seconds between exports")
+    parser.add_argument("--profile-rounds", type=int, default=0, help="capture a profile of the next N rounds")
+    parser.add_argument("--profile-mode", choices=CAPTURE_MODES, default="cprofile")
+    parser.add_argument("--ticket-pool", default=None, help="deal scratch cards from a pool made by ticketpool.py")
+    parser.add_argument("--hourly-loss", type=int, default=None, help="maximum net loss in any rolling hour")
+    parser.add_argument("--daily-loss", type=int, default=None, help="maximum net loss in any rolling day")
+    parser.add_argument("--session-minutes", type=int, default=None, help="session time cap before a cool-down")
+    parser.add_argument("--cooldown-minutes", type=int, default=None, help="length of the cool-down after a session")
+    parser.add_argument("--player", default=None, help="keep this player's balance in the shared account database")
+    parser.add_argument("--db", default=ACCOUNTS_FILE, help="account database used with --player")
+    args = parser.parse_args()
+    limits = {name: value for name, value in (("hourly_loss", args.hourly_loss), ("daily_loss", args.daily_loss),
+                                              ("session_minutes", args.session_minutes),
+                                              ("cooldown_minutes", args.cooldown_minutes)) if value is not None}
+    
+    ticket_pool = None
+    if args.ticket_pool:
+        # NumPy solo se importa si se juega con una tirada pregenerada
+        from ticketpool import TicketPool
+        ticket_pool = TicketPool(args.ticket_pool)
+    
+    instrumentation = None
+    if args.metrics or args.profile_rounds:
+        instrumentation = Instrumentation()
+        if args.profile_rounds:
+            instrumentation.start_capture(args.profile_rounds, args.profile_mode)
+    
+    accounts = AccountStore(args.db) if args.player else None
+    
     root = tk.Tk()
-    app = CasinoGame(root)
-    root.mainloop()
+    app = CasinoGame(root, report_startup=args.startup_report, instrumentation=instrumentation,
+                     report_frames=args.frame_report, ticket_pool=ticket_pool, limits=limits,
+                     accounts=accounts, player_id=args.player)
+    if args.metrics:
+        app.metrics_path = args.metrics
+        instrumentation.export_every(root, int(args.metrics_interval * 1000), args.metrics)
+    try:
+        root.mainloop()
+    finally:
+        app.shutdown()
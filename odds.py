@@ -0,0 +1,111 @@
+"""Exact outcome probabilities and expected return for the paytables."""
+import argparse
+from fractions import Fraction
+from math import factorial
+
+from engine import SCRATCH_TABLE, SLOT_TABLE
+from paytable import compositions, threshold_multipliers
+
+
+def _probabilities(n_symbols, weights):
+    if weights is None:
+        return [Fraction(1, n_symbols)] * n_symbols
+    if len(weights) != n_symbols:
+        raise ValueError("Se necesita un peso por símbolo")
+    weights = [Fraction(w) for w in weights]
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def _capped_mass(probabilities, draws, cap):
+    # P(ningun simbolo sale mas de `cap` veces), via funciones generatrices exponenciales
+    poly = [Fraction(0)] * (draws + 1)
+    poly[0] = Fraction(1)
+    for p in probabilities:
+        terms = [p ** c / factorial(c) for c in range(min(cap, draws) + 1)]
+        new = [Fraction(0)] * (draws + 1)
+        for d, coef in enumerate(poly):
+            if coef:
+                for c, term in enumerate(terms[:draws - d + 1]):
+                    new[d + c] += coef * term
+        poly = new
+    return poly[draws] * factorial(draws)
+
+
+def max_count_distribution(n_symbols=SCRATCH_TABLE.n_symbols, cells=SCRATCH_TABLE.cells, weights=None):
+    probabilities = _probabilities(n_symbols, weights)
+    distribution = {}
+    previous = Fraction(0)
+    for cap in range(1, cells + 1):
+        mass = _capped_mass(probabilities, cells, cap)
+        if mass != previous:
+            distribution[cap] = mass - previous
+        previous = mass
+    return distribution
+
+
+def summarize(distribution, returns):
+    rtp = sum(p * returns.get(outcome, 0) for outcome, p in distribution.items())
+    variance = sum(p * (returns.get(outcome, 0) - rtp) ** 2 for outcome, p in distribution.items())
+    return {
+        "distribution": distribution,
+        "rtp": rtp,
+        "house_edge": 1 - rtp,
+        "hit_frequency": sum(p for outcome, p in distribution.items() if returns.get(outcome, 0) > 0),
+        "variance": variance,
+    }
+
+
+def return_distribution(table, weights=None):
+    # recorre las firmas de la tabla compilada; necesario si hay pagos por simbolo
+    probabilities = _probabilities(table.n_symbols, weights or table.weights)
+    distribution = {}
+    for counts in compositions(table.cells, table.n_symbols):
+        p = Fraction(factorial(table.cells))
+        for probability, count in zip(probabilities, counts):
+            p *= probability ** count / factorial(count)
+        unit_return = table.unit_return(table.outcome_for_counts(counts).multiplier)
+        distribution[unit_return] = distribution.get(unit_return, 0) + p
+    return distribution
+
+
+def game_odds(table, n_symbols=None, cells=None, weights=None):
+    n_symbols = n_symbols or table.n_symbols
+    cells = cells or table.cells
+    if weights is None and n_symbols == table.n_symbols:
+        weights = table.weights
+
+    if table.symbol_payouts and (n_symbols, cells) == (table.n_symbols, table.cells):
+        distribution = return_distribution(table, weights)
+        return summarize(distribution, {unit_return: unit_return for unit_return in distribution})
+
+    multipliers = threshold_multipliers(table.payouts, cells)
+    returns = {count: table.unit_return(multiplier) for count, multiplier in enumerate(multipliers)}
+    return summarize(max_count_distribution(n_symbols, cells, weights), returns)
+
+
+def slot_odds(table=SLOT_TABLE, n_symbols=None, reels=None, weights=None):
+    return game_odds(table, n_symbols, reels, weights)
+
+
+def scratch_odds(table=SCRATCH_TABLE, n_symbols=None, cells=None, weights=None):
+    return game_odds(table, n_symbols, cells, weights)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exact odds for the casino games.")
+    parser.add_argument("game", choices=["slot", "scratch"])
+    parser.add_argument("--symbols", type=int, default=None)
+    parser.add_argument("--size", type=int, default=None, help="reels or grid cells")
+    parser.add_argument("--weights", type=float, nargs="+", default=None)
+    args = parser.parse_args()
+
+    table = SLOT_TABLE if args.game == "slot" else SCRATCH_TABLE
+    odds = game_odds(table, n_symbols=args.symbols, cells=args.size, weights=args.weights)
+
+    for outcome, p in sorted(odds["distribution"].items()):
+        print(f"{outcome}: {float(p):.10f}")
+    print(f"RTP: {float(odds['rtp']):.10f}")
+    print(f"House edge: {float(odds['house_edge']):.10f}")
+    print(f"Hit frequency: {float(odds['hit_frequency']):.10f}")
+    print(f"Variance: {float(odds['variance']):.10f}")
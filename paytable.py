@@ -0,0 +1,135 @@
+"""Paytables read from paytables.json and compiled into outcome lookup tables.
+
+A round is encoded by adding one counter per symbol into a single integer
+(`bits` bits per symbol), so the counts of a reel line or a scratch grid map
+to one precomputed entry regardless of the order of the cells.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+from math import comb
+
+PAYTABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paytables.json")
+MAX_PRECOMPILED = 200_000
+
+Outcome = namedtuple("Outcome", ["multiplier", "max_count", "unique"])
+
+
+def compositions(total, parts):
+    if parts == 1:
+        yield (total,)
+        return
+    for first in range(total, -1, -1):
+        for rest in compositions(total - first, parts - 1):
+            yield (first,) + rest
+
+
+def threshold_multipliers(payouts, cells):
+    # {"3": 2, "5": 10} -> multiplicador para cada cantidad de simbolos iguales
+    payouts = {int(count): multiplier for count, multiplier in payouts.items()}
+    multipliers = []
+    current = 0
+    for count in range(cells + 1):
+        current = payouts.get(count, current)
+        multipliers.append(current)
+    return multipliers
+
+
+class GameTable:
+    def __init__(self, symbols, weights, cells, payouts, symbol_payouts=None,
+                 bet_kept_on_win=False, price=None, columns=None):
+        if len(weights) != len(symbols):
+            raise ValueError("Se necesita un peso por símbolo")
+        if any(int(w) != w or w <= 0 for w in weights):
+            raise ValueError("Los pesos deben ser enteros positivos")
+
+        self.symbols = list(symbols)
+        self.n_symbols = len(symbols)
+        self.weights = [int(w) for w in weights]
+        self.uniform = len(set(self.weights)) == 1
+        self.cells = cells
+        self.columns = columns or cells
+        self.rows = cells // self.columns
+        self.price = price
+        self.bet_kept_on_win = bet_kept_on_win
+        self.payouts = {int(count): multiplier for count, multiplier in payouts.items()}
+        self.symbol_payouts = symbol_payouts or {}
+
+        # sorteo ponderado: un indice uniforme en [0, draw_range) se traduce con draw_map
+        if self.uniform:
+            self.draw_map = list(range(self.n_symbols))
+        else:
+            self.draw_map = [i for i, weight in enumerate(self.weights) for _ in range(weight)]
+        self.draw_range = len(self.draw_map)
+
+        self.bits = cells.bit_length()
+        self.mask = (1 << self.bits) - 1
+        self.units = [1 << (self.bits * i) for i in range(self.n_symbols)]
+
+        default = threshold_multipliers(payouts, cells)
+        self.count_multipliers = []
+        for symbol in self.symbols:
+            overrides = self.symbol_payouts.get(symbol)
+            if overrides:
+                merged = dict(payouts)
+                merged.update(overrides)
+                self.count_multipliers.append(threshold_multipliers(merged, cells))
+            else:
+                self.count_multipliers.append(default)
+        self.default_multipliers = default
+        self.min_win = next((count for count, multiplier in enumerate(default) if multiplier), None)
+
+        self.outcomes = {}
+        if comb(cells + self.n_symbols - 1, self.n_symbols - 1) <= MAX_PRECOMPILED:
+            for counts in compositions(cells, self.n_symbols):
+                self.outcomes[self.signature_of_counts(counts)] = self.outcome_for_counts(counts)
+
+    def signature_of_counts(self, counts):
+        return sum(count << (self.bits * i) for i, count in enumerate(counts))
+
+    def counts(self, signature):
+        return [(signature >> (self.bits * i)) & self.mask for i in range(self.n_symbols)]
+
+    def outcome_for_counts(self, counts):
+        multiplier = max(self.count_multipliers[i][count] for i, count in enumerate(counts))
+        return Outcome(multiplier, max(counts), sum(1 for count in counts if count))
+
+    def lookup(self, signature):
+        outcome = self.outcomes.get(signature)
+        if outcome is None:
+            outcome = self.outcomes[signature] = self.outcome_for_counts(self.counts(signature))
+        return outcome
+
+    def evaluate(self, indices):
+        units = self.units
+        return self.lookup(sum([units[i] for i in indices]))
+
+    def unit_return(self, multiplier):
+        # lo que vuelve al jugador por cada unidad apostada
+        if multiplier and self.bet_kept_on_win:
+            return multiplier + 1
+        return multiplier
+
+
+def load_paytables(path=PAYTABLE_FILE):
+    with open(path, "r", encoding="utf-8") as file:
+        config = json.load(file)
+
+    version = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    symbols = config["symbols"]
+    weights = config.get("weights", [1] * len(symbols))
+    slot = config["slot"]
+    scratch = config["scratch"]
+    return {
+        "version": version,
+        "symbols": symbols,
+        "slot": GameTable(
+            symbols, weights, slot["reels"], slot["payouts"], slot.get("symbol_payouts"),
+            bet_kept_on_win=slot.get("bet_kept_on_win", True),
+        ),
+        "scratch": GameTable(
+            symbols, weights, scratch["rows"] * scratch["columns"], scratch["payouts"], scratch.get("symbol_payouts"),
+            bet_kept_on_win=scratch.get("bet_kept_on_win", False), price=scratch["price"], columns=scratch["columns"],
+        ),
+    }
@@ -0,0 +1,88 @@
+"""Reading and writing the saved game state.
+
+Saves go to a temporary file that is fsynced and renamed over the old one,
+and the previous copy is kept as a backup, so a crash never leaves the
+state half written. SaveScheduler coalesces bursts of changes into at
+most one write per interval.
+"""
+import json
+import os
+import time
+
+DATA_FILE = "casino_data.json"
+SAVE_DELAY = 0.25
+SAVE_INTERVAL = 2.0
+
+
+def backup_path(path):
+    return path + ".bak"
+
+
+def _fsync_directory(path):
+    # el rename solo es durable cuando se sincroniza el directorio (no existe en Windows)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def save_state(data, path=DATA_FILE, fsync=True):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file)
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    if os.path.exists(path):
+        os.replace(path, backup_path(path))
+    os.replace(temporary, path)
+    if fsync:
+        _fsync_directory(path)
+
+
+def load_state(path=DATA_FILE):
+    # si falta el archivo o esta corrupto se usa la copia anterior
+    for candidate in (path, backup_path(path)):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r") as file:
+                return json.load(file)
+        except ValueError:
+            print(f"Estado ilegible en {candidate}")
+    return None
+
+
+class SaveScheduler:
+    def __init__(self, root, save, delay=SAVE_DELAY, interval=SAVE_INTERVAL):
+        self.root = root
+        self.save = save
+        self.delay = delay
+        self.interval = interval
+        self.last_save = None
+        self.task = None
+
+    def request(self):
+        # mientras hay una escritura pendiente los cambios nuevos se suman a ella
+        if self.task is not None:
+            return
+        wait = self.delay
+        if self.last_save is not None:
+            wait = max(wait, self.last_save + self.interval - time.monotonic())
+        self.task = self.root.after(int(wait * 1000), self.run)
+
+    def run(self):
+        self.task = None
+        self.last_save = time.monotonic()
+        self.save()
+
+    def cancel(self):
+        if self.task is not None:
+            self.root.after_cancel(self.task)
+            self.task = None
@@ -0,0 +1,191 @@
+"""Audit log of every round and a streaming verifier to replay it.
+
+Rounds drawn through a RecordingRNG also carry the raw values the generator
+returned ("stream"). The verifier feeds them back through a ReplayRNG and the
+normal draw path, so weighted tables are checked from the draw up.
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+
+from engine import PAYTABLE_VERSION, SCRATCH_TABLE, SLOT_TABLE, card_from_indices, draw_card, spin, spin_from_indices
+from rng import ReplayRNG
+
+AUDIT_FILE = "casino_audit.jsonl"
+MAX_REPORTED = 100
+
+
+class AuditLog:
+    def __init__(self, path=AUDIT_FILE, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.round = 0
+        self.session = None
+        self.file = None
+
+    def start_session(self, balance, rng_name=None, seed=None):
+        self.round = 0
+        self.session = time.time()
+        self.write({
+            "session": self.session,
+            "paytable": PAYTABLE_VERSION,
+            "rng": rng_name,
+            "seed": seed,
+            "balance": balance,
+        })
+
+    def record(self, game, result, balance, stream=None):
+        self.round += 1
+        record = {
+            "round": self.round,
+            "game": game,
+            "paytable": PAYTABLE_VERSION,
+            "draws": result.indices,
+            "bet": result.bet,
+            "delta": result.delta,
+            "balance": balance,
+        }
+        if stream:
+            record["stream"] = stream
+        self.write(record)
+
+    def record_jackpot(self, key, amount, balance):
+        self.write({"jackpot": key, "amount": amount, "balance": balance})
+
+    def write(self, record):
+        self.buffer.append(json.dumps(record, separators=(",", ":")) + "\n")
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write("".join(self.buffer))
+        self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def replay_round(record):
+    # con el flujo grabado la ronda se vuelve a sortear; si no, se evalua desde los simbolos
+    if record["game"] == "slot":
+        table, evaluate = SLOT_TABLE, spin_from_indices
+    elif record["game"] == "scratch":
+        table, evaluate = SCRATCH_TABLE, card_from_indices
+    else:
+        raise ValueError(f"Juego desconocido: {record['game']}")
+    draws = record["draws"]
+    if "stream" in record:
+        rng = ReplayRNG(record["stream"])
+        if record["game"] == "slot":
+            result = spin(record["bet"], rng, table)
+        else:
+            result = draw_card(rng, record["bet"], table)
+        if not rng.exhausted():
+            raise ValueError("Sobran valores en el flujo grabado")
+        if result.indices != draws:
+            raise ValueError(f"El flujo grabado da {result.indices} y no {draws}")
+        return result
+    if len(draws) != table.cells or min(draws) < 0 or max(draws) >= table.n_symbols:
+        raise ValueError(f"Símbolos grabados inválidos: {draws}")
+    return evaluate(draws, record["bet"], table)
+
+
+def verify(path, paytable=PAYTABLE_VERSION):
+    report = {"sessions": 0, "rounds": 0, "jackpots": 0, "errors": 0, "problems": []}
+
+    def problem(line_number, message):
+        report["errors"] += 1
+        if len(report["problems"]) < MAX_REPORTED:
+            report["problems"].append((line_number, message))
+
+    balance = None
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                problem(line_number, "línea ilegible")
+                continue
+
+            if "session" in record:
+                report["sessions"] += 1
+                balance = record["balance"]
+                continue
+
+            if "jackpot" in record:
+                # el premio sale del pozo compartido: solo se comprueba el saldo
+                report["jackpots"] += 1
+                if balance is not None and balance + record["amount"] != record["balance"]:
+                    problem(line_number, f"saldo {record['balance']} pero se esperaba {balance + record['amount']}")
+                balance = record["balance"]
+                continue
+
+            report["rounds"] += 1
+            if record.get("paytable") != paytable:
+                problem(line_number, f"tabla de pagos {record.get('paytable')} distinta de {paytable}")
+                balance = record.get("balance")
+                continue
+
+            try:
+                result = replay_round(record)
+            except (KeyError, ValueError) as e:
+                problem(line_number, f"no se puede reproducir: {e}")
+                balance = record.get("balance")
+                continue
+
+            if result.delta != record["delta"]:
+                problem(line_number, f"resultado {record['delta']} pero las reglas dan {result.delta}")
+            if balance is not None and balance + result.delta != record["balance"]:
+                problem(line_number, f"saldo {record['balance']} pero se esperaba {balance + result.delta}")
+            balance = record["balance"]
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def find_round(path, line_number):
+    with open(path, "r", encoding="utf-8") as file:
+        line = next(itertools.islice(file, line_number - 1, None), None)
+    if line is None:
+        raise ValueError(f"No existe la línea {line_number}")
+    return json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify or replay the casino audit log.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    verify_parser = subparsers.add_parser("verify")
+    verify_parser.add_argument("path", nargs="?", default=AUDIT_FILE)
+    show_parser = subparsers.add_parser("show")
+    show_parser.add_argument("line", type=int)
+    show_parser.add_argument("path", nargs="?", default=AUDIT_FILE)
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        report = verify(args.path)
+        rate = report["rounds"] / report["seconds"] if report["seconds"] else 0
+        size = os.path.getsize(args.path)
+        print(f"Sessions: {report['sessions']}  Rounds: {report['rounds']}  Jackpots: {report['jackpots']}  Errors: {report['errors']}")
+        print(f"Verified {size / 1e6:.1f} MB in {report['seconds']:.2f}s ({rate:,.0f} rounds/s)")
+        for line_number, message in report["problems"]:
+            print(f"  line {line_number}: {message}")
+    else:
+        record = find_round(args.path, args.line)
+        print(json.dumps(record, ensure_ascii=False))
+        if "session" in record:
+            raise SystemExit(0)
+        result = replay_round(record)
+        print(f"Symbols: {result.symbols}")
+        print(f"Winnings: ${result.winnings}  Delta: ${result.delta}")
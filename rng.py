@@ -0,0 +1,123 @@
+"""Random sources for the games.
+
+Every backend draws symbol indices with index(n)/indices(n, count) and also
+offers choice(seq), so it can be passed anywhere the random module was used.
+"""
+import hashlib
+import random
+import secrets
+
+DEFAULT_BLOCK = 4096
+
+
+def _numpy():
+    # NumPy tarda en importarse y solo lo usa FastRNG, asi que se carga al crearlo
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def derive_seed(*parts):
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+class SymbolRNG:
+    def index(self, n):
+        raise NotImplementedError
+
+    def indices(self, n, count):
+        index = self.index
+        return [index(n) for _ in range(count)]
+
+    def choice(self, seq):
+        return seq[self.index(len(seq))]
+
+
+class FastRNG(SymbolRNG):
+    # con NumPy los bloques salen de PCG64; sin NumPy, de random.Random (otra secuencia)
+    def __init__(self, seed=None, block_size=DEFAULT_BLOCK):
+        self.seed = seed
+        self.block_size = block_size
+        self.np = _numpy()
+        if self.np is not None:
+            self.generator = self.np.random.default_rng(seed)
+        else:
+            self.generator = random.Random(seed)
+        self.blocks = {}
+
+    def refill(self, n):
+        if self.np is not None:
+            block = self.generator.integers(0, n, size=self.block_size, dtype=self.np.int64).tolist()
+        else:
+            block = self.generator.choices(range(n), k=self.block_size)
+        block.reverse()
+        self.blocks[n] = block
+        return block
+
+    def index(self, n):
+        block = self.blocks.get(n)
+        if not block:
+            block = self.refill(n)
+        return block.pop()
+
+    def indices(self, n, count):
+        block = self.blocks.get(n)
+        if not block or len(block) < count:
+            return [self.index(n) for _ in range(count)]
+        # los bloques se guardan al reves para que pop() sea O(1)
+        start = len(block) - count
+        result = block[start:]
+        del block[start:]
+        result.reverse()
+        return result
+
+
+class SecureRNG(SymbolRNG):
+    def index(self, n):
+        return secrets.randbelow(n)
+
+
+class RecordingRNG(SymbolRNG):
+    # guarda los valores crudos que entrega la fuente, antes de pasar por draw_map
+    def __init__(self, source):
+        self.source = source
+        self.draws = []
+
+    def index(self, n):
+        value = self.source.index(n)
+        self.draws.append(value)
+        return value
+
+    def indices(self, n, count):
+        values = self.source.indices(n, count)
+        self.draws.extend(values)
+        return values
+
+    def take(self):
+        draws, self.draws = self.draws, []
+        return draws
+
+
+class ReplayRNG(SymbolRNG):
+    def __init__(self, draws):
+        self.draws = list(draws)
+        self.position = 0
+
+    def index(self, n):
+        return self.indices(n, 1)[0]
+
+    def indices(self, n, count):
+        end = self.position + count
+        values = self.draws[self.position:end]
+        if len(values) < count:
+            raise ValueError("El flujo grabado se terminó")
+        if values and (min(values) < 0 or max(values) >= n):
+            raise ValueError(f"Valor grabado fuera de rango: {values}")
+        self.position = end
+        return values
+
+    def exhausted(self):
+        return self.position == len(self.draws)
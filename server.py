@@ -0,0 +1,195 @@
+"""Asyncio server that plays slots and scratch cards over newline-delimited JSON.
+
+Each request is one JSON object per line, for example:
+    {"id": 1, "op": "spin", "player": "ana", "bet": 10}
+    {"id": 2, "op": "scratch", "player": "ana"}
+    {"id": 3, "op": "balance", "player": "ana"}
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from accounts import ACCOUNTS_FILE, MAX_AMOUNT, AccountStore, UnknownPlayerError
+from engine import SCRATCH_PRICE, draw_card, spin
+from jackpot import JACKPOT_FILE, JackpotPool, triggers_jackpot
+from limits import LIMITS_FILE, PlayerLimits
+from rng import SecureRNG
+
+MAX_LINE = 4096
+
+
+class GameServer:
+    def __init__(self, store, rng=None, io_threads=4, jackpot=None, limits=None):
+        self.store = store
+        self.rng = rng or SecureRNG()
+        self.jackpot = jackpot
+        self.limits = limits
+        self.executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="casino-io")
+        self.locks = weakref.WeakValueDictionary()
+        self.server = None
+
+    def lock_for(self, player_id):
+        lock = self.locks.get(player_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.locks[player_id] = lock
+        return lock
+
+    async def run_io(self, function, *args):
+        # SQLite nunca corre en el hilo del event loop
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def settle(self, player_id, result):
+        try:
+            return self.store.settle_result(player_id, result)
+        except UnknownPlayerError:
+            self.store.open_account(player_id)
+            return self.store.settle_result(player_id, result)
+
+    async def handle_request(self, request):
+        op = request.get("op")
+        player_id = request.get("player")
+        if not isinstance(player_id, str) or not player_id:
+            raise ValueError("Falta el jugador.")
+
+        if op == "balance":
+            account = await self.run_io(self.store.open_account, player_id)
+            return {"account": account}
+
+        if op == "spin":
+            bet = request.get("bet")
+            if not isinstance(bet, int) or isinstance(bet, bool) or bet <= 0:
+                raise ValueError("La apuesta debe ser mayor a cero.")
+            if bet > MAX_AMOUNT:
+                # ningun saldo guardado llega a tanto; ni siquiera se intenta liquidar
+                raise ValueError("No tienes suficiente saldo para esta apuesta.")
+            result = spin(bet, self.rng)
+        elif op == "scratch":
+            result = draw_card(self.rng, SCRATCH_PRICE)
+        else:
+            raise ValueError(f"Operación desconocida: {op}")
+
+        # una ronda por jugador a la vez; settle() ademas rechaza saldo insuficiente
+        async with self.lock_for(player_id):
+            if self.limits is not None:
+                # se comprueba dentro del candado del jugador: dos pedidos no pasan a la vez
+                reason = self.limits.get(player_id).check(result.bet)
+                if reason is not None:
+                    raise ValueError(reason)
+            account = await self.run_io(self.settle, player_id, result)
+            if self.limits is not None:
+                self.limits.record(player_id, result.delta)
+            jackpot = await self.play_jackpot(op, player_id, result)
+            if jackpot:
+                account = await self.run_io(self.store.credit, player_id, jackpot)
+
+        if self.limits is not None and self.limits.due():
+            # la copia se toma en el event loop; solo la escritura va al hilo de E/S
+            await self.run_io(self.limits.save, self.limits.snapshot())
+
+        response = {
+            "symbols": result.symbols,
+            "bet": result.bet,
+            "winnings": result.winnings,
+            "delta": result.delta,
+            "account": account,
+        }
+        if jackpot:
+            response["jackpot"] = jackpot
+        return response
+
+    async def play_jackpot(self, op, player_id, result):
+        if self.jackpot is None:
+            return 0
+        self.jackpot.contribute(result.bet)
+        if not triggers_jackpot(op, result):
+            if self.jackpot.claim_flush():
+                # el fsync del shard tampoco corre en el event loop
+                await self.run_io(self.jackpot.flush)
+            return 0
+        # el premio toma el candado del pozo compartido, fuera del event loop
+        return await self.run_io(self.jackpot.award, f"server:{player_id}:{uuid.uuid4().hex}")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                response = await self.respond(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, line):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("La petición debe ser un objeto JSON.")
+            request_id = request.get("id")
+            response = await self.handle_request(request)
+            response.update(id=request_id, ok=True)
+        except ValueError as e:
+            response = {"id": request_id, "ok": False, "error": str(e)}
+        except (sqlite3.Error, OverflowError, OSError):
+            # un premio que desborda el saldo o un fallo de disco no cortan la conexion
+            response = {"id": request_id, "ok": False, "error": "No se pudo registrar la ronda."}
+        return response
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE, backlog=4096)
+        return self.server
+
+    async def serve_forever(self, host="127.0.0.1", port=8765):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=True)
+        self.store.close()
+        if self.jackpot is not None:
+            self.jackpot.close()
+        if self.limits is not None:
+            self.limits.save()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the casino games over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=ACCOUNTS_FILE)
+    parser.add_argument("--jackpot", nargs="?", const=JACKPOT_FILE, default=None,
+                        help="fund and pay the shared progressive jackpot")
+    parser.add_argument("--limits", default=LIMITS_FILE, help="file with each player's limit counters")
+    parser.add_argument("--hourly-loss", type=int, default=None, help="maximum net loss per player in any rolling hour")
+    parser.add_argument("--daily-loss", type=int, default=None, help="maximum net loss per player in any rolling day")
+    parser.add_argument("--session-minutes", type=int, default=None, help="session time cap before a cool-down")
+    parser.add_argument("--cooldown-minutes", type=int, default=None, help="length of the cool-down after a session")
+    args = parser.parse_args()
+
+    jackpot = JackpotPool(args.jackpot) if args.jackpot else None
+    limits = None
+    if args.hourly_loss is not None or args.daily_loss is not None or args.session_minutes is not None:
+        limits = PlayerLimits(args.limits, hourly_loss=args.hourly_loss, daily_loss=args.daily_loss,
+                              session_minutes=args.session_minutes, cooldown_minutes=args.cooldown_minutes)
+    game_server = GameServer(AccountStore(args.db), jackpot=jackpot, limits=limits)
+    try:
+        asyncio.run(game_server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        game_server.close()
@@ -0,0 +1,65 @@
+"""Fixed-width binary log of every round, written with struct only.
+
+The file is a 64-byte header followed by 48-byte records; logreader.py
+maps it with NumPy for analysis.
+"""
+import struct
+import time
+
+from history import GAME_IDS
+
+SESSION_LOG_FILE = "casino_rounds.bin"
+MAGIC = b"CASLOG01"
+HEADER = struct.Struct("<8sHH")
+HEADER_SIZE = 64
+MAX_CELLS = 14
+RECORD = struct.Struct(f"<dqqqBB{MAX_CELLS}s")
+
+
+class SessionLog:
+    def __init__(self, path=SESSION_LOG_FILE, batch_size=256):
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.file = None
+
+    def _open(self):
+        self.file = open(self.path, "ab")
+        size = self.file.tell()
+        if size < HEADER_SIZE:
+            self.file.truncate(0)
+            self.file.write(HEADER.pack(MAGIC, RECORD.size, MAX_CELLS).ljust(HEADER_SIZE, b"\0"))
+        elif (size - HEADER_SIZE) % RECORD.size:
+            # registro a medio escribir de una caida
+            self.file.truncate(size - (size - HEADER_SIZE) % RECORD.size)
+
+    def record(self, game, result, balance, timestamp=None):
+        indices = result.indices
+        if len(indices) > MAX_CELLS:
+            raise ValueError(f"El registro admite hasta {MAX_CELLS} símbolos")
+        self.buffer.append(RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            result.bet,
+            result.bet + result.delta,
+            balance,
+            GAME_IDS[game],
+            len(indices),
+            bytes(indices),
+        ))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.file is None:
+            self._open()
+        self.file.write(b"".join(self.buffer))
+        self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,92 @@
+"""Monte Carlo return-to-player estimates for both games using NumPy batches."""
+import argparse
+import math
+
+import numpy as np
+
+from engine import SCRATCH_TABLE, SLOT_TABLE
+
+DEFAULT_CHUNK = 1 << 20
+Z_95 = 1.959963984540054
+
+
+class CompiledTable:
+    # la tabla de pagos de paytable.py en forma de arreglos, ordenada por firma
+    def __init__(self, table):
+        if not table.outcomes or table.bits * table.n_symbols > 64:
+            raise ValueError("La tabla de pagos es demasiado grande para simularla en bloque")
+        self.table = table
+        self.signatures = np.array(sorted(table.outcomes), dtype=np.uint64)
+        outcomes = [table.outcomes[signature] for signature in self.signatures.tolist()]
+        self.returns = np.array([table.unit_return(outcome.multiplier) for outcome in outcomes], dtype=np.float64)
+        self.max_counts = np.array([outcome.max_count for outcome in outcomes], dtype=np.intp)
+        self.units = np.array(table.units, dtype=np.uint64)
+        weights = np.array(table.weights, dtype=np.float64)
+        self.probabilities = None if table.uniform else weights / weights.sum()
+
+    def draw(self, rng, n):
+        shape = (n, self.table.cells)
+        if self.probabilities is None:
+            return rng.integers(0, self.table.n_symbols, size=shape, dtype=np.uint8)
+        return rng.choice(self.table.n_symbols, size=shape, p=self.probabilities).astype(np.uint8)
+
+    def classify(self, draws):
+        signatures = self.units[draws].sum(axis=1, dtype=np.uint64)
+        return np.searchsorted(self.signatures, signatures)
+
+
+def summarize(outcomes, compiled):
+    outcomes = outcomes.astype(np.float64)
+    returns = compiled.returns
+    rounds = outcomes.sum()
+    mean = outcomes @ returns / rounds
+    variance = outcomes @ (returns - mean) ** 2 / rounds
+    margin = Z_95 * math.sqrt(variance / rounds)
+    by_count = np.bincount(compiled.max_counts, weights=outcomes, minlength=compiled.table.cells + 1)
+    return {
+        "rounds": int(rounds),
+        "rtp": float(mean),
+        "house_edge": float(1 - mean),
+        "hit_frequency": float(outcomes[returns > 0].sum() / rounds),
+        "variance": float(variance),
+        "ci95": (float(mean - margin), float(mean + margin)),
+        "outcomes": {count: int(n) for count, n in enumerate(by_count) if n},
+    }
+
+
+def simulate(table, rounds, seed=None, chunk_size=DEFAULT_CHUNK):
+    compiled = CompiledTable(table)
+    rng = np.random.default_rng(seed)
+    outcomes = np.zeros(len(compiled.signatures), dtype=np.int64)
+    remaining = rounds
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        outcomes += np.bincount(compiled.classify(compiled.draw(rng, n)), minlength=len(outcomes))
+        remaining -= n
+    return summarize(outcomes, compiled)
+
+
+def simulate_slots(rounds, seed=None, chunk_size=DEFAULT_CHUNK, table=SLOT_TABLE):
+    return simulate(table, rounds, seed, chunk_size)
+
+
+def simulate_scratch(rounds, seed=None, chunk_size=DEFAULT_CHUNK, table=SCRATCH_TABLE):
+    return simulate(table, rounds, seed, chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate RTP for the casino games.")
+    parser.add_argument("game", choices=["slot", "scratch"])
+    parser.add_argument("rounds", type=int)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    args = parser.parse_args()
+
+    simulate_game = simulate_slots if args.game == "slot" else simulate_scratch
+    stats = simulate_game(args.rounds, seed=args.seed, chunk_size=args.chunk_size)
+    low, high = stats["ci95"]
+    print(f"Rounds: {stats['rounds']}")
+    print(f"RTP: {stats['rtp']:.6f} (95% CI {low:.6f} - {high:.6f})")
+    print(f"House edge: {stats['house_edge']:.6f}")
+    print(f"Hit frequency: {stats['hit_frequency']:.6f}")
+    print(f"Variance: {stats['variance']:.6f}")
@@ -0,0 +1,213 @@
+"""Pre-generated scratch card runs with an exact number of tickets per prize tier.
+
+A run is built per tier: every symbol-count composition that pays the
+tier's multiplier is a template, templates are sampled with their
+multinomial probability and the cells of each ticket are shuffled. Each
+ticket is packed into one integer (`bits` bits per cell) and the run is
+dealt from a memory-mapped file with a cursor kept in a sidecar file.
+"""
+import argparse
+import os
+import struct
+import time
+from fractions import Fraction
+from math import factorial
+
+import numpy as np
+
+from engine import PAYTABLE_VERSION, SCRATCH_TABLE
+from paytable import compositions
+
+MAGIC = b"CASPOOL1"
+HEADER = struct.Struct("<8sHHHHQ16s")
+HEADER_SIZE = 64
+CHUNK_TICKETS = 1 << 20
+
+
+class PoolExhaustedError(Exception):
+    pass
+
+
+def cell_bits(table):
+    return max(1, (table.n_symbols - 1).bit_length())
+
+
+def packed_dtype(table):
+    bits = cell_bits(table) * table.cells
+    if bits > 64:
+        raise ValueError("La tarjeta no entra en un entero de 64 bits")
+    return np.dtype("<u4") if bits <= 32 else np.dtype("<u8")
+
+
+def tier_templates(table):
+    # multiplicador -> (cantidades por simbolo de cada composicion, probabilidad exacta)
+    total = sum(table.weights)
+    probabilities = [Fraction(weight, total) for weight in table.weights]
+    tiers = {}
+    for counts in compositions(table.cells, table.n_symbols):
+        p = Fraction(factorial(table.cells))
+        for probability, count in zip(probabilities, counts):
+            p *= probability ** count / factorial(count)
+        multiplier = table.outcome_for_counts(counts).multiplier
+        tiers.setdefault(multiplier, []).append((counts, p))
+    return tiers
+
+
+def tier_targets(table, tickets, overrides=None):
+    # reparto exacto por el metodo del resto mayor; los premios fijados a mano se respetan
+    # y lo que sobra va al nivel sin premio
+    overrides = dict(overrides or {})
+    tiers = tier_templates(table)
+    probabilities = {multiplier: sum(p for _, p in templates) for multiplier, templates in tiers.items()}
+    for multiplier in overrides:
+        if multiplier not in tiers:
+            raise ValueError(f"No existe un nivel de premio x{multiplier}")
+
+    free = [multiplier for multiplier in tiers if multiplier not in overrides]
+    remaining = tickets - sum(overrides.values())
+    if remaining < 0:
+        raise ValueError("Los premios fijados superan el tamaño de la tirada")
+    free_mass = sum(probabilities[multiplier] for multiplier in free)
+    exact = {multiplier: probabilities[multiplier] / free_mass * remaining for multiplier in free}
+    targets = {multiplier: int(share) for multiplier, share in exact.items()}
+    leftover = remaining - sum(targets.values())
+    for multiplier in sorted(free, key=lambda m: exact[m] - targets[m], reverse=True)[:leftover]:
+        targets[multiplier] += 1
+    targets.update(overrides)
+    return dict(sorted(targets.items()))
+
+
+def _tier_cells(rng, counts_list, probabilities, n, n_symbols, cells):
+    templates = np.array([np.repeat(np.arange(n_symbols), counts) for counts in counts_list], dtype=np.uint8)
+    weights = np.array([float(p) for p in probabilities])
+    chosen = rng.choice(len(templates), size=n, p=weights / weights.sum())
+    tickets = templates[chosen]
+    # se barajan las celdas de cada tarjeta ordenando claves aleatorias por fila
+    order = rng.random((n, cells)).argsort(axis=1)
+    return np.take_along_axis(tickets, order, axis=1)
+
+
+def pack(cells, bits, dtype):
+    shifts = (np.arange(cells.shape[1], dtype=np.uint64) * bits).astype(dtype)
+    return np.bitwise_or.reduce(cells.astype(dtype) << shifts, axis=1)
+
+
+def generate(path, tickets, seed=None, overrides=None, table=SCRATCH_TABLE):
+    rng = np.random.default_rng(seed)
+    bits = cell_bits(table)
+    dtype = packed_dtype(table)
+    targets = tier_targets(table, tickets, overrides)
+    tiers = tier_templates(table)
+
+    packed = np.empty(tickets, dtype=dtype)
+    position = 0
+    for multiplier, target in targets.items():
+        counts_list = [counts for counts, _ in tiers[multiplier]]
+        probabilities = [p for _, p in tiers[multiplier]]
+        for start in range(0, target, CHUNK_TICKETS):
+            n = min(CHUNK_TICKETS, target - start)
+            cells = _tier_cells(rng, counts_list, probabilities, n, table.n_symbols, table.cells)
+            packed[position:position + n] = pack(cells, bits, dtype)
+            position += n
+    rng.shuffle(packed)
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        header = HEADER.pack(MAGIC, table.n_symbols, table.cells, bits, dtype.itemsize, tickets,
+                             PAYTABLE_VERSION.encode("ascii"))
+        file.write(header.ljust(HEADER_SIZE, b"\0"))
+        packed.tofile(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    cursor_path = path + ".cursor"
+    if os.path.exists(cursor_path):
+        os.remove(cursor_path)
+    return targets
+
+
+class TicketPool:
+    def __init__(self, path, table=SCRATCH_TABLE):
+        self.path = path
+        self.table = table
+        with open(path, "rb") as file:
+            magic, n_symbols, cells, bits, itemsize, tickets, version = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es una tirada de tarjetas")
+        self.paytable = version.rstrip(b"\0").decode("ascii")
+        if (n_symbols, cells) != (table.n_symbols, table.cells) or self.paytable != PAYTABLE_VERSION:
+            raise ValueError("La tirada no corresponde a la tabla de pagos actual")
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.tickets = tickets
+        dtype = np.dtype("<u4") if itemsize == 4 else np.dtype("<u8")
+        self.packed = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(tickets,))
+
+        # el cursor se guarda antes de entregar la tarjeta: tras una caida se salta, nunca se repite
+        self.cursor_fd = os.open(path + ".cursor", os.O_RDWR | os.O_CREAT, 0o644)
+        data = os.pread(self.cursor_fd, 8, 0)
+        self.cursor = struct.unpack("<Q", data)[0] if len(data) == 8 else 0
+
+    def remaining(self):
+        return self.tickets - self.cursor
+
+    def unpack(self, value):
+        bits = self.bits
+        mask = self.mask
+        return [(value >> (bits * i)) & mask for i in range(self.table.cells)]
+
+    def deal(self):
+        if self.cursor >= self.tickets:
+            raise PoolExhaustedError("La tirada de tarjetas se agotó")
+        value = int(self.packed[self.cursor])
+        self.cursor += 1
+        os.pwrite(self.cursor_fd, struct.pack("<Q", self.cursor), 0)
+        return self.unpack(value)
+
+    def tier_counts(self, start=0):
+        # cuenta cuantas tarjetas quedan por nivel sin desempaquetarlas una por una
+        counts = {}
+        units = np.array(self.table.units, dtype=np.uint64)
+        for chunk_start in range(start, self.tickets, CHUNK_TICKETS):
+            values = np.asarray(self.packed[chunk_start:chunk_start + CHUNK_TICKETS]).astype(np.uint64)
+            cells = (values[:, None] >> (np.arange(self.table.cells, dtype=np.uint64) * self.bits)) & self.mask
+            signatures = units[cells.astype(np.intp)].sum(axis=1)
+            unique, n = np.unique(signatures, return_counts=True)
+            for signature, count in zip(unique.tolist(), n.tolist()):
+                multiplier = self.table.lookup(signature).multiplier
+                counts[multiplier] = counts.get(multiplier, 0) + count
+        return dict(sorted(counts.items()))
+
+    def close(self):
+        os.close(self.cursor_fd)
+
+
+def parse_tier(text):
+    multiplier, count = text.split("=")
+    return int(multiplier), int(count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or inspect scratch card ticket pools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate_parser = subparsers.add_parser("generate")
+    generate_parser.add_argument("path")
+    generate_parser.add_argument("tickets", type=int)
+    generate_parser.add_argument("--seed", type=int, default=None)
+    generate_parser.add_argument("--tier", type=parse_tier, action="append", default=[],
+                                 help="fixed ticket count for a prize tier, e.g. 100=25")
+    info_parser = subparsers.add_parser("info")
+    info_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        start = time.perf_counter()
+        targets = generate(args.path, args.tickets, args.seed, dict(args.tier))
+        print(f"Generated {args.tickets} tickets in {time.perf_counter() - start:.2f}s")
+        for multiplier, count in targets.items():
+            print(f"  x{multiplier}: {count}")
+    else:
+        pool = TicketPool(args.path)
+        print(f"Tickets: {pool.tickets}  Dealt: {pool.cursor}  Remaining: {pool.remaining()}  Paytable: {pool.paytable}")
+        for multiplier, count in pool.tier_counts(pool.cursor).items():
+            print(f"  x{multiplier}: {count}")